@@ -0,0 +1,121 @@
+"""Throughput benchmark of the JSON aggregate API (dashboard/api.py).
+
+Starts the API server in this process, on an ephemeral port, and has a number
+of client threads request a mix of endpoints and filter states over
+keep-alive connections for a fixed time. With --revalidate, clients send back
+the ETag they got, as a polling consumer would, and mostly receive 304s.
+
+    python benchmarks/api_throughput.py --data benchmarks/data/suicide_x10.csv --clients 8
+
+The first pass over the mix fills the memo and is not timed. The report is
+JSON: requests per second, latency percentiles and status counts.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+
+def _mix(countries, years):
+    """Request paths covering every endpoint over a few filter states"""
+    states = [
+        '',
+        f'?years={years[1] - 6}-{years[1]}',
+        '?sex=Female&age=15-24+years',
+    ] + [f'?country={country.replace(" ", "+")}' for country in countries[:5]]
+    endpoints = ['kpis', 'age-sex', 'countries', 'gender', 'income', 'top']
+    return [f'/api/{endpoint}{query}' for endpoint, query in itertools.product(endpoints, states)]
+
+
+def _client(port, paths, deadline, revalidate, latencies, statuses):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    etags = {}
+    for path in itertools.cycle(paths):
+        if time.perf_counter() > deadline:
+            break
+        headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+        started = time.perf_counter()
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        etags[path] = response.getheader('ETag')
+    connection.close()
+
+
+def measure(clients, seconds, revalidate):
+    from dashboard import api
+    from dashboard.ingest import live_dataset
+
+    df, backend, _ = live_dataset().snapshot()
+    server = api.make_server('127.0.0.1', 0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    countries, years, _, _ = api.options(df, backend)
+    paths = _mix(countries[1:], years)
+    warm = http.client.HTTPConnection('127.0.0.1', port)
+    for path in paths:
+        warm.request('GET', path)
+        warm.getresponse().read()
+    warm.close()
+
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=_client, args=(port, paths, deadline, revalidate, latencies, statuses))
+        for _ in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        'rows': len(df),
+        'clients': clients,
+        'revalidate': revalidate,
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(cuts[49] * 1000, 2),
+            'p95': round(cuts[94] * 1000, 2),
+            'p99': round(cuts[98] * 1000, 2),
+        },
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', type=Path, help="CSV to serve (default: the dashboard's)")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--revalidate', action='store_true', help='send If-None-Match with the last ETag')
+    args = parser.parse_args(argv)
+
+    if args.data:
+        os.environ['DASHBOARD_DATA_PATH'] = str(args.data.resolve())
+    # Only the API is measured; the delta watcher stays off
+    os.environ['DASHBOARD_DELTA_POLL_SECONDS'] = '0'
+
+    print(json.dumps(measure(args.clients, args.seconds, args.revalidate), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
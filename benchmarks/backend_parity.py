@@ -0,0 +1,175 @@
+"""Check that every query backend gives the same panel numbers.
+
+Evaluates each panel aggregate of dashboard.aggregates for a set of filter
+states (a fixed list plus random ones) on every available backend and
+compares the results with the 'pandas' cube backend. Backends whose package
+is not installed are skipped. Exits non-zero on the first mismatching state
+of every backend and prints a per-backend timing summary.
+
+    python benchmarks/backend_parity.py --states 200 --data benchmarks/data/suicide_x10.csv
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from dashboard import aggregates  # noqa: E402
+from dashboard.aggregates import AGE_ORDER, make_filter_state  # noqa: E402
+from dashboard.backends import BACKENDS, create_backend  # noqa: E402
+from dashboard.data_store import load_dataset  # noqa: E402
+
+REFERENCE = 'pandas'
+
+
+def country_trends(backend, state):
+    return aggregates.series_trends(backend, state, ('Country',))
+
+
+def group_trends(backend, state):
+    return aggregates.series_trends(backend, state, ('Country', 'Sex', 'Age'))
+
+
+# Every panel aggregate, called as aggregate(backend, state)
+PANELS = [
+    aggregates.kpis,
+    aggregates.country_rates,
+    aggregates.age_sex_rates,
+    aggregates.gender_trends,
+    aggregates.time_trends,
+    aggregates.gdp_correlation,
+    aggregates.country_overview,
+    aggregates.top_countries,
+    country_trends,
+    group_trends,
+    aggregates.fastest_rising,
+]
+
+
+def _filter_states(df, count, seed):
+    """A fixed list of edge-case states followed by random ones"""
+    countries = sorted(df['Country'].unique().tolist())
+    years = int(df['Year'].min()), int(df['Year'].max())
+    sexes = sorted(df['Sex'].unique().tolist())
+    states = [
+        make_filter_state(['All'], years, sexes, AGE_ORDER),
+        make_filter_state(['All'], (2010, years[1]), sexes, AGE_ORDER),
+        make_filter_state(countries[:1], years, sexes, AGE_ORDER),
+        make_filter_state(countries[:12], years, ['Female'], AGE_ORDER),
+        make_filter_state(['All'], years, sexes, ['15-24 years']),
+        make_filter_state(['All'], (years[0], years[0]), sexes, AGE_ORDER),
+        make_filter_state(['All'], years, [], AGE_ORDER),
+    ]
+    rng = random.Random(seed)
+    for _ in range(count):
+        picked = ['All'] if rng.random() < 0.3 else rng.sample(countries, rng.randint(1, 15))
+        first = rng.randint(*years)
+        states.append(make_filter_state(
+            picked,
+            (first, rng.randint(first, years[1])),
+            rng.sample(sexes, rng.randint(1, len(sexes))),
+            rng.sample(AGE_ORDER, rng.randint(1, len(AGE_ORDER)))
+        ))
+    return states
+
+
+def _mismatch(expected, actual, path='result'):
+    """Describe the first difference between two aggregate results, or None"""
+    if isinstance(expected, pd.DataFrame):
+        if not isinstance(actual, pd.DataFrame):
+            return f"{path}: expected a DataFrame, got {type(actual).__name__}"
+        try:
+            pd.testing.assert_frame_equal(
+                expected.reset_index(drop=True), actual.reset_index(drop=True),
+                check_exact=False, rtol=1e-9, check_dtype=False, check_categorical=False
+            )
+        except AssertionError as exc:
+            return f"{path}: {str(exc).splitlines()[0]}"
+        return None
+    if isinstance(expected, (tuple, list)):
+        if not isinstance(actual, (tuple, list)) or len(expected) != len(actual):
+            return f"{path}: expected {expected!r}, got {actual!r}"
+        for i, (left, right) in enumerate(zip(expected, actual)):
+            found = _mismatch(left, right, f'{path}[{i}]')
+            if found:
+                return found
+        return None
+    if isinstance(expected, dict):
+        if not isinstance(actual, dict) or expected.keys() != actual.keys():
+            return f"{path}: expected keys {sorted(expected)}, got {actual!r}"
+        for key in expected:
+            found = _mismatch(expected[key], actual[key], f'{path}[{key!r}]')
+            if found:
+                return found
+        return None
+    if isinstance(expected, (float, np.floating)) and isinstance(actual, (int, float, np.number)):
+        if math.isnan(expected) and math.isnan(actual):
+            return None
+        if math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9):
+            return None
+    elif expected == actual:
+        return None
+    return f"{path}: expected {expected!r}, got {actual!r}"
+
+
+def check(df, names, count, seed):
+    """Compare every backend in `names` against the reference; return a report"""
+    states = _filter_states(df, count, seed)
+    backends, report = {}, {'states': len(states), 'backends': {}}
+    for name in [REFERENCE] + [n for n in names if n != REFERENCE]:
+        try:
+            started = time.perf_counter()
+            backends[name] = create_backend(name, df)
+            report['backends'][name] = {'build_s': round(time.perf_counter() - started, 3),
+                                        'query_s': 0.0, 'mismatches': []}
+        except ImportError as exc:
+            report['backends'][name] = {'skipped': str(exc)}
+
+    for state in states:
+        expected = None
+        for name, backend in backends.items():
+            entry = report['backends'][name]
+            started = time.perf_counter()
+            results = [panel(backend, state) for panel in PANELS]
+            entry['query_s'] += time.perf_counter() - started
+            if name == REFERENCE:
+                expected = results
+                continue
+            if entry['mismatches']:
+                continue
+            for panel, want, got in zip(PANELS, expected, results):
+                found = _mismatch(want, got, panel.__name__)
+                if found:
+                    entry['mismatches'].append({'state': state._asdict(), 'difference': found})
+                    break
+
+    for entry in report['backends'].values():
+        if 'query_s' in entry:
+            entry['query_s'] = round(entry['query_s'], 3)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', nargs='+', default=sorted(BACKENDS), choices=sorted(BACKENDS))
+    parser.add_argument('--states', type=int, default=100, help="random filter states on top of the fixed ones")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data', type=Path, help="CSV to check (default: the dashboard's)")
+    args = parser.parse_args(argv)
+
+    report = check(load_dataset(args.data), args.backends, args.states, args.seed)
+    print(json.dumps(report, indent=2, default=str))
+    failed = any(entry.get('mismatches') for entry in report['backends'].values())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Concurrent-session load test of healthcare.py over Streamlit's websocket.
+
+Starts the dashboard with ``streamlit run`` on localhost and, for each
+concurrency level, opens that many simulated browser sessions on
+/_stcore/stream. Like a browser, each session sends BackMsg rerun requests
+carrying widget states and reads the ForwardMsg deltas until the script
+finishes. It signs in through the check_password form, then replays random
+sidebar edits (countries, year range, sex, age groups) and Economic Factors
+view switches (fragment reruns), with exponential think times in between.
+
+Per level it reports the throughput and the p50/p95/p99 rerun latency over
+the steady window after the ramp-up, the sign-in latency, errors and the
+server's resident memory. The server is started once, so caches filled at
+one level serve the next, as in a long-running replica.
+
+    python benchmarks/load_test.py --username USER --password PASSWORD --levels 1 10 50 100 200 --duration 30
+
+Needs the ``websockets`` package, which Streamlit's server already installs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASE_DIR = BENCH_DIR.parent
+APP_PATH = BASE_DIR / 'healthcare.py'
+
+WIDGET_TYPES = {'multiselect', 'slider', 'radio', 'checkbox', 'text_input'}
+FINISHED = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}
+
+
+class Session:
+    """One simulated browser session on the Streamlit websocket"""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.widgets = {}  # label -> (widget proto, fragment id)
+        self.query_string = ''
+        self._ws = None
+
+    async def open(self):
+        self._ws = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def rerun(self, states=(), fragment_id=''):
+        """Request a rerun with the given widget states; returns its latency in seconds"""
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        msg.rerun_script.widget_states.widgets.extend(states)
+        msg.rerun_script.fragment_id = fragment_id
+        started = time.perf_counter()
+        await self._ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._until_finished(), self.timeout)
+        return time.perf_counter() - started
+
+    async def _until_finished(self):
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self._ws.recv())
+            kind = msg.WhichOneof('type')
+            if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    self.widgets[widget.label] = (widget, msg.delta.fragment_id)
+            elif kind == 'page_info_changed':
+                self.query_string = msg.page_info_changed.query_string
+            elif kind == 'script_finished':
+                if msg.script_finished in FINISHED:
+                    return
+                raise RuntimeError(f"script run ended with {ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)}")
+
+    def widget(self, label):
+        return self.widgets[label][0]
+
+
+def _state(widget, **value):
+    state = WidgetState(id=widget.id)
+    for field, data in value.items():
+        if field.endswith('_array_value'):
+            getattr(state, field).data.extend(data)
+        else:
+            setattr(state, field, data)
+    return state
+
+
+async def sign_in(session, username, password):
+    """Fill in the login form; returns the latency of the run drawing the dashboard"""
+    states = [
+        _state(session.widget("Username"), string_value=username),
+        _state(session.widget("Password"), string_value=password),
+    ]
+    latency = await session.rerun(states)
+    if "Countries" not in session.widgets:
+        raise RuntimeError("sign-in failed; check the credentials")
+    return latency
+
+
+def random_interaction(session, rng):
+    """(kind, widget states, fragment id) of one random user action"""
+    action = rng.choices(['countries', 'years', 'sex', 'ages', 'econ_view'], weights=[4, 2, 1, 2, 3])[0]
+    if action == 'countries':
+        widget = session.widget("Countries")
+        countries = [option for option in widget.options if option != 'All']
+        picked = rng.choice([['All'], rng.sample(countries, 1), rng.sample(countries, rng.randint(2, 5))])
+        return action, [_state(widget, string_array_value=picked)], ''
+    if action == 'years':
+        widget = session.widget("Year Range")
+        first = rng.randint(int(widget.min), int(widget.max))
+        last = rng.randint(first, int(widget.max))
+        return action, [_state(widget, double_array_value=[first, last])], ''
+    if action in ('sex', 'ages'):
+        widget = session.widget("Sex" if action == 'sex' else "Age Groups")
+        options = list(widget.options)
+        picked = rng.sample(options, rng.randint(1, len(options)))
+        return action, [_state(widget, string_array_value=picked)], ''
+    widget, fragment_id = session.widgets["View:"]
+    return action, [_state(widget, string_value=rng.choice(list(widget.options)))], fragment_id
+
+
+async def run_session(url, args, rng, measure_from, deadline, results):
+    session = Session(url, args.timeout)
+    try:
+        await session.open()
+        await session.rerun()
+        results['sign_in'].append(await sign_in(session, args.username, args.password))
+        while True:
+            await asyncio.sleep(rng.expovariate(1 / args.think) if args.think > 0 else 0)
+            if time.perf_counter() >= deadline:
+                break
+            kind, states, fragment_id = random_interaction(session, rng)
+            latency = await session.rerun(states, fragment_id)
+            if time.perf_counter() >= measure_from:
+                results['reruns'].append((kind, latency))
+    except Exception as exc:
+        results['errors'].append(f'{type(exc).__name__}: {exc}')
+    finally:
+        await session.close()
+
+
+def rss_bytes(pid):
+    """Resident set size of a process, from /proc (Linux) or psutil"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(pid).memory_info().rss
+
+
+async def _sample_rss(pid, samples, stop):
+    while not stop.is_set():
+        rss = rss_bytes(pid)
+        if rss is not None:
+            samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        return {key: round(values[0] * 1000, 1) if values else None for key in ('p50', 'p95', 'p99')}
+    cuts = statistics.quantiles(values, n=100)
+    return {'p50': round(cuts[49] * 1000, 1), 'p95': round(cuts[94] * 1000, 1), 'p99': round(cuts[98] * 1000, 1)}
+
+
+async def run_level(url, sessions, args, pid, seed):
+    """Run one concurrency level and summarize it"""
+    results = {'sign_in': [], 'reruns': [], 'errors': []}
+    rss, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(pid, rss, stop)) if pid else None
+
+    started = time.perf_counter()
+    measure_from = started + args.ramp
+    deadline = measure_from + args.duration
+    tasks = []
+    for i in range(sessions):
+        await asyncio.sleep(args.ramp / sessions)
+        rng = random.Random(seed * 100003 + i)
+        tasks.append(asyncio.create_task(run_session(url, args, rng, measure_from, deadline, results)))
+    await asyncio.gather(*tasks)
+    window = max(time.perf_counter(), deadline) - measure_from
+    stop.set()
+    if sampler is not None:
+        await sampler
+
+    latencies = [latency for _, latency in results['reruns']]
+    by_kind = {}
+    for kind, latency in results['reruns']:
+        by_kind.setdefault(kind, []).append(latency)
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'throughput_per_s': round(len(latencies) / window, 2),
+        'latency_ms': _percentiles(latencies),
+        'latency_ms_by_action': {kind: _percentiles(values) for kind, values in sorted(by_kind.items())},
+        'sign_in_ms': _percentiles(results['sign_in']),
+        'errors': len(results['errors']),
+        'error_samples': sorted(set(results['errors']))[:5],
+        'rss_mb': {
+            'peak': round(max(rss) / 2**20, 1) if rss else None,
+            'end': round(rss[-1] / 2**20, 1) if rss else None,
+        },
+    }
+
+
+def start_server(port, data):
+    """Start healthcare.py with `streamlit run`; returns the process once it is healthy"""
+    env = dict(os.environ)
+    if data:
+        env['DASHBOARD_DATA_PATH'] = str(Path(data).resolve())
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(APP_PATH), '--server.port', str(port),
+         '--server.headless', 'true', '--browser.gatherUsageStats', 'false'],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=2) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("streamlit did not become healthy within 120s")
+
+
+async def run(args, pid):
+    url = f'ws://127.0.0.1:{args.port}/_stcore/stream'
+    levels = []
+    for seed, sessions in enumerate(args.levels):
+        level = await run_level(url, sessions, args, pid, seed)
+        print(json.dumps(level), file=sys.stderr)
+        levels.append(level)
+    return levels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--levels', nargs='+', type=int, default=[1, 10, 50, 100], help="concurrent sessions per level")
+    parser.add_argument('--duration', type=float, default=30, help="measured seconds per level, after the ramp")
+    parser.add_argument('--ramp', type=float, default=5, help="seconds over which a level's sessions start")
+    parser.add_argument('--think', type=float, default=2, help="mean think time between actions, in seconds")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--data', type=Path, help="CSV to serve (default: the dashboard's)")
+    parser.add_argument('--external', action='store_true',
+                        help="test a server already listening on --port instead of starting one (no RSS)")
+    parser.add_argument('--output', type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    server = None if args.external else start_server(args.port, args.data)
+    try:
+        levels = asyncio.run(run(args, server.pid if server else None))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = json.dumps({
+        'benchmark': 'load_test',
+        'duration_seconds': args.duration,
+        'think_seconds': args.think,
+        'levels': levels,
+    }, indent=2)
+    if args.output:
+        args.output.write_text(report + '\n')
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Time-to-login-form and time-to-first-chart of healthcare.py.
+
+Each sample runs in a fresh interpreter, as the first session of a new
+server process: AppTest draws the login form, waits --typing seconds as a
+user entering credentials would, signs in and draws the dashboard. Reported
+per sample are the wall time of both script runs and the 'login_form' and
+'first_chart' milestones the app records (see dashboard.timing.mark).
+
+    python benchmarks/login_latency.py --username USER --password PASSWORD --samples 5 --typing 3
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASE_DIR = BENCH_DIR.parent
+APP_PATH = BASE_DIR / 'healthcare.py'
+
+sys.path.insert(0, str(BASE_DIR))
+
+
+def run_sample(username, password, typing, timeout):
+    """Sign in once in this process and return its timings in seconds"""
+    from streamlit.testing.v1 import AppTest
+
+    from dashboard import timing
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    started = time.perf_counter()
+    at.run()
+    login_wall = time.perf_counter() - started
+    login_run = timing.recent_runs[-1]
+
+    time.sleep(typing)
+    at.text_input(key='username').input(username)
+    at.text_input(key='password').input(password)
+    started = time.perf_counter()
+    at.run()
+    dashboard_wall = time.perf_counter() - started
+    if at.exception or not at.get('plotly_chart'):
+        raise RuntimeError("sign-in did not draw the dashboard; check the credentials")
+    dashboard_run = timing.recent_runs[-1]
+
+    return {
+        'login_form_wall': login_wall,
+        'login_form': login_run['stages'].get('login_form'),
+        'first_chart_wall': dashboard_wall,
+        'first_chart': dashboard_run['stages'].get('first_chart'),
+    }
+
+
+def _summarize(samples):
+    summary = {}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        summary[key] = {
+            'median_ms': round(statistics.median(values) * 1000, 1),
+            'max_ms': round(max(values) * 1000, 1),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--samples', type=int, default=5, help="fresh processes to measure")
+    parser.add_argument('--typing', type=float, default=3, help="seconds between login form and sign-in")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per script run")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_sample(args.username, args.password, args.typing, args.timeout)))
+        return 0
+
+    samples = []
+    for _ in range(args.samples):
+        out = subprocess.run(
+            [sys.executable, __file__, '--worker', '--username', args.username, '--password', args.password,
+             '--typing', str(args.typing), '--timeout', str(args.timeout)],
+            cwd=BASE_DIR, check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(json.dumps({
+        'benchmark': 'login_latency',
+        'typing_seconds': args.typing,
+        'summary': _summarize(samples),
+        'samples': samples,
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Report the bytes every chart sends before and after payload compaction.
+
+Builds each chart of healthcare.py for a few filter states and prints the
+serialized size st.plotly_chart sends, next to the size the same figure had
+before dashboard.compaction rewrote it, per chart and state.
+
+    python benchmarks/payload_sizes.py --data benchmarks/data/suicide_x10.csv
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import streamlit  # noqa: E402,F401  (installs the Plotly template the app sends)
+
+from dashboard import figures, settings  # noqa: E402
+from dashboard.aggregates import AGE_ORDER, make_filter_state  # noqa: E402
+from dashboard.backends import create_backend  # noqa: E402
+from dashboard.data_store import load_dataset  # noqa: E402
+
+# Sizes before compaction are only recorded in an instrumented process
+settings.INSTRUMENTED = True
+
+# (chart, function) pairs, called as function(backend, state)
+CHARTS = [
+    ('age', figures.age_chart),
+    ('map', figures.map_chart),
+    ('gender', figures.gender_chart),
+    ('economic.trends', lambda backend, state: figures.economic_chart(backend, state, "Time Trends", False)),
+    ('economic.gdp', lambda backend, state: figures.economic_chart(backend, state, "GDP Correlation", False)),
+    ('economic.gdp_animated', lambda backend, state: figures.economic_chart(backend, state, "GDP Correlation", True)),
+    ('economic.overview', lambda backend, state: figures.economic_chart(backend, state, "Country Overview", False)),
+    ('economic.rising', lambda backend, state: figures.economic_chart(backend, state, "Fastest Rising", False)),
+    ('top', figures.top_chart),
+]
+
+
+def _filter_states(df):
+    countries = sorted(df['Country'].unique().tolist())
+    years = int(df['Year'].min()), int(df['Year'].max())
+    sexes = sorted(df['Sex'].unique().tolist())
+    return {
+        'default': make_filter_state(['All'], years, sexes, AGE_ORDER),
+        'since_2010': make_filter_state(['All'], (2010, years[1]), sexes, AGE_ORDER),
+        'five_countries': make_filter_state(countries[:5], years, sexes, AGE_ORDER),
+    }
+
+
+def measure(df, backend_name):
+    backend = create_backend(backend_name, df)
+    report = {}
+    for state_name, state in _filter_states(df).items():
+        sizes = {}
+        for chart, function in CHARTS:
+            spec = function(backend, state)
+            sent, raw = figures.payload_bytes(spec), figures.raw_payload_bytes(spec)
+            sizes[chart] = {'raw_bytes': raw, 'sent_bytes': sent, 'ratio': round(sent / raw, 3) if raw else None}
+        sizes['total'] = {
+            'raw_bytes': sum(entry['raw_bytes'] for entry in sizes.values()),
+            'sent_bytes': sum(entry['sent_bytes'] for entry in sizes.values()),
+        }
+        sizes['total']['ratio'] = round(sizes['total']['sent_bytes'] / sizes['total']['raw_bytes'], 3)
+        report[state_name] = sizes
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', type=Path, help="CSV to chart (default: the dashboard's)")
+    parser.add_argument('--backend', default='pandas')
+    args = parser.parse_args(argv)
+
+    print(json.dumps(measure(load_dataset(args.data), args.backend), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
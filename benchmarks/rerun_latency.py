@@ -0,0 +1,225 @@
+"""Headless rerun-latency benchmark of healthcare.py.
+
+Drives the app through Streamlit's AppTest, signs in through the login form
+and replays a fixed catalog of sidebar and panel interactions. Every rerun
+reports its end-to-end latency and the per-stage timings recorded by
+dashboard.timing. Each data scale runs in a fresh process, so the rerun that
+draws the dashboard after sign-in is a true cold start.
+
+    python benchmarks/rerun_latency.py --username USER --password PASSWORD --scales 1 10 100 --passes 3
+
+The first pass of the catalog misses every cache, later passes replay the
+same filter states. The report is JSON, one entry per scale.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASE_DIR = BENCH_DIR.parent
+APP_PATH = BASE_DIR / 'healthcare.py'
+
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+import synthetic_data  # noqa: E402
+
+
+def _widget(elements, label):
+    """The widget of a kind with the given label"""
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _countries(at, count):
+    """The first countries offered by the Countries multiselect"""
+    options = _widget(at.multiselect, "Countries").options
+    return [option for option in options if option != 'All'][:count]
+
+
+def _year_range(at, first=None):
+    slider = _widget(at.slider, "Year Range")
+    low, high = slider.min, slider.max
+    return (max(low, first) if first else low, high)
+
+
+# (name, action) pairs replayed in order; each action sets one widget and
+# the rerun it triggers is what gets timed
+CATALOG = [
+    ('countries.one', lambda at: _widget(at.multiselect, "Countries").set_value(_countries(at, 1))),
+    ('countries.five', lambda at: _widget(at.multiselect, "Countries").set_value(_countries(at, 5))),
+    ('countries.all', lambda at: _widget(at.multiselect, "Countries").set_value(['All'])),
+    ('years.recent', lambda at: _widget(at.slider, "Year Range").set_range(*_year_range(at, 2010))),
+    ('years.all', lambda at: _widget(at.slider, "Year Range").set_range(*_year_range(at))),
+    ('sex.female', lambda at: _widget(at.multiselect, "Sex").set_value(['Female'])),
+    ('sex.both', lambda at: _widget(at.multiselect, "Sex").set_value(['Female', 'Male'])),
+    ('ages.youth', lambda at: _widget(at.multiselect, "Age Groups").set_value(['15-24 years'])),
+    ('ages.all', lambda at: _widget(at.multiselect, "Age Groups").set_value(
+        _widget(at.multiselect, "Age Groups").options)),
+    ('econ_view.gdp', lambda at: at.radio(key="econ_view").set_value("GDP Correlation")),
+    ('animate_gdp.on', lambda at: at.checkbox(key="animate_gdp").check()),
+    ('animate_gdp.off', lambda at: at.checkbox(key="animate_gdp").uncheck()),
+    ('econ_view.overview', lambda at: at.radio(key="econ_view").set_value("Country Overview")),
+    ('econ_view.rising', lambda at: at.radio(key="econ_view").set_value("Fastest Rising")),
+    ('econ_view.trends', lambda at: at.radio(key="econ_view").set_value("Time Trends")),
+]
+
+
+def _timed_run(at, timing, name, pass_index):
+    """Rerun the app and return its latency record"""
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    run = timing.recent_runs[-1] if timing.recent_runs else None
+    record = {
+        'interaction': name,
+        'pass': pass_index,
+        'total_ms': round(elapsed * 1000, 3),
+        'script_ms': round(run['total'] * 1000, 3) if run else None,
+        'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in run['stages'].items()} if run else {},
+    }
+    if at.exception:
+        record['error'] = [exception.message for exception in at.exception]
+    return record
+
+
+def _summary(records):
+    """Latency percentiles of a list of rerun records"""
+    totals = sorted(record['total_ms'] for record in records)
+    if not totals:
+        return {}
+
+    def percentile(q):
+        return totals[min(len(totals) - 1, int(round(q * (len(totals) - 1))))]
+
+    stages = {}
+    for record in records:
+        for stage, ms in record['stages_ms'].items():
+            stages.setdefault(stage, []).append(ms)
+    return {
+        'reruns': len(totals),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'max_ms': totals[-1],
+        'mean_ms': round(statistics.fmean(totals), 3),
+        'stage_median_ms': {stage: round(statistics.median(values), 3) for stage, values in stages.items()},
+    }
+
+
+def run_worker(csv_path, username, password, passes, timeout):
+    """Sign in and replay the catalog against one CSV in this process"""
+    from streamlit.testing.v1 import AppTest
+
+    from dashboard import timing
+
+    os.chdir(BASE_DIR)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    at.run()
+    at.text_input(key='username').input(username)
+    at.text_input(key='password').input(password)
+    # The cold start is the run that draws the dashboard after sign-in
+    records = [_timed_run(at, timing, 'initial', 0)]
+    if records[0].get('error') or not at.get('plotly_chart'):
+        raise RuntimeError("sign-in did not draw the dashboard; check the credentials")
+    for pass_index in range(passes):
+        for name, action in CATALOG:
+            action(at)
+            records.append(_timed_run(at, timing, name, pass_index))
+
+    by_pass = {}
+    for record in records[1:]:
+        by_pass.setdefault(record['pass'], []).append(record)
+    return {
+        'csv': str(csv_path),
+        'csv_bytes': Path(csv_path).stat().st_size,
+        'cold_start_ms': records[0]['total_ms'],
+        'summary': {f'pass_{index}': _summary(items) for index, items in sorted(by_pass.items())},
+        'reruns': records,
+    }
+
+
+def _environment():
+    """Versions and commit the results were measured with"""
+    import numpy
+    import pandas
+    import plotly
+    import streamlit
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'streamlit': streamlit.__version__,
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'plotly': plotly.__version__,
+    }
+
+
+def run_scale(scale, args):
+    """Benchmark one scale factor in a fresh interpreter"""
+    csv_path = synthetic_data.ensure(scale, args.data_dir)
+    env = dict(os.environ, DASHBOARD_DATA_PATH=str(csv_path))
+    # Cold-start numbers are meant without the background prewarm, unless asked for
+    env.setdefault('DASHBOARD_PREWARM', 'off')
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / 'result.json'
+        subprocess.run(
+            [sys.executable, __file__, '--worker', str(csv_path), '--username', args.username,
+             '--password', args.password, '--passes', str(args.passes), '--timeout', str(args.timeout),
+             '--output', str(out)],
+            env=env, check=True
+        )
+        result = json.loads(out.read_text())
+    result['scale'] = scale
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--scales', nargs='+', type=int, default=[1, 10], help="data scale factors")
+    parser.add_argument('--passes', type=int, default=3, help="replays of the interaction catalog")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per rerun")
+    parser.add_argument('--data-dir', type=Path, default=synthetic_data.DATA_DIR)
+    parser.add_argument('--output', type=Path, help="write the JSON report here instead of stdout")
+    parser.add_argument('--worker', metavar='CSV', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        report = run_worker(args.worker, args.username, args.password, args.passes, args.timeout)
+    else:
+        report = {
+            'benchmark': 'rerun_latency',
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'environment': _environment(),
+            'catalog': [name for name, _ in CATALOG],
+            'scales': [run_scale(scale, args) for scale in args.scales],
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
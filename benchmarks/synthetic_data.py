@@ -0,0 +1,103 @@
+"""Scale Suicide_dashboard.csv up for benchmarks.
+
+Every replica is a copy of the original rows under suffixed country names
+("Albania #2", ...), with the same schema and shape. Population, rate and
+GDP are perturbed by small log-normal factors, so the distributions stay
+close to the original. Suicide counts are derived from the perturbed rate
+and population, so the three columns stay consistent.
+
+    python benchmarks/synthetic_data.py 10 100 1000
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SOURCE_CSV = BASE_DIR / 'Suicide_dashboard.csv'
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+
+def scaled_path(scale, data_dir=DATA_DIR):
+    """Path of the synthetic CSV of a scale factor (the original for 1)"""
+    if scale == 1:
+        return SOURCE_CSV
+    return Path(data_dir) / f'suicide_x{scale}.csv'
+
+
+def _replica(base, replica, rng):
+    """One perturbed copy of the original rows"""
+    countries = base['Country'].astype('category')
+    n_countries = len(countries.cat.categories)
+    country_codes = countries.cat.codes.to_numpy()
+
+    # One factor per country keeps every series smooth over the years,
+    # the per-row noise keeps rows from being plain multiples of the original
+    population_factor = rng.lognormal(0.0, 0.05, n_countries)[country_codes]
+    rate_factor = rng.lognormal(0.0, 0.10, n_countries)[country_codes]
+    gdp_factor = rng.lognormal(0.0, 0.10, n_countries)[country_codes]
+    noise = rng.lognormal(0.0, 0.05, len(base))
+
+    population = np.maximum(np.rint(base['Population'].to_numpy() * population_factor), 1).astype(np.int64)
+    rate = base['Suicides/100K Population'].to_numpy() * rate_factor * noise
+    count = np.rint(rate * population / 100000).astype(np.int64)
+
+    out = base.copy()
+    out['Country'] = countries.cat.rename_categories(lambda name: f'{name} #{replica + 1}').astype(str)
+    out['Suicides Count'] = count
+    out['Population'] = population
+    out['Suicides/100K Population'] = np.round(count / population * 100000, 2)
+    out['GDP Per Capita ($)'] = np.rint(base['GDP Per Capita ($)'].to_numpy() * gdp_factor).astype(np.int64)
+    return out
+
+
+def generate(scale, path=None, seed=0, source=SOURCE_CSV):
+    """Write the CSV scaled up by an integer factor and return its path.
+
+    The original rows come first, followed by scale - 1 perturbed replicas.
+    Replicas are written one at a time, so memory stays flat at any scale.
+    """
+    if scale < 1:
+        raise ValueError("scale must be a positive integer")
+    base = pd.read_csv(source)
+    path = Path(path or scaled_path(scale))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    tmp = path.with_suffix('.tmp')
+    base.to_csv(tmp, index=False)
+    for replica in range(1, scale):
+        _replica(base, replica, rng).to_csv(tmp, mode='a', header=False, index=False)
+    tmp.replace(path)
+    return path
+
+
+def ensure(scale, data_dir=DATA_DIR, seed=0):
+    """Return the CSV of a scale factor, generating it on first use"""
+    path = scaled_path(scale, data_dir)
+    if not path.exists():
+        generate(scale, path, seed=seed)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scales', nargs='+', type=int, help="scale factors, e.g. 10 100 1000")
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--force', action='store_true', help="regenerate existing files")
+    args = parser.parse_args(argv)
+
+    for scale in args.scales:
+        path = scaled_path(scale, args.data_dir)
+        if args.force and scale > 1:
+            generate(scale, path, seed=args.seed)
+        else:
+            path = ensure(scale, args.data_dir, seed=args.seed)
+        print(f"{scale}x: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
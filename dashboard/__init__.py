@@ -0,0 +1 @@
+"""Data and computation layer for the Global Suicide Statistics Dashboard."""
@@ -0,0 +1,221 @@
+"""Panel aggregates of the dashboard, memoized per filter state.
+
+Every function takes the query backend (see dashboard.backends) and a
+canonical FilterState, and returns the table (or values) one panel draws.
+Results are shared by every session through the process-wide LRU memo, so
+callers must not modify them.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dashboard import trends
+from dashboard.memo import memoize
+
+AGE_ORDER = ['5-14 years', '15-24 years', '25-34 years', '35-54 years', '55-74 years', '75+ years']
+INCOME_ORDER = ['Low Income', 'Lower Middle', 'Upper Middle', 'High Income']
+INCOME_COLORS = {
+    'Low Income': '#d62728',
+    'Lower Middle': '#ff7f0e',
+    'Upper Middle': '#2ca02c',
+    'High Income': '#1f77b4'
+}
+
+# Canonical, order-insensitive filter state: countries is None for 'All',
+# the other members are sorted tuples so equivalent selections share a key
+FilterState = namedtuple('FilterState', ['countries', 'years', 'sexes', 'ages'])
+
+
+def make_filter_state(selected_countries, year_range, selected_sex, selected_ages):
+    """Build the canonical FilterState for the sidebar selections"""
+    if 'All' in selected_countries:
+        countries = None
+    else:
+        countries = tuple(sorted(set(selected_countries)))
+    return FilterState(
+        countries=countries,
+        years=(int(year_range[0]), int(year_range[1])),
+        sexes=tuple(sorted(set(selected_sex))),
+        ages=tuple(sorted(set(selected_ages)))
+    )
+
+
+# Income levels based on the GDP per capita distribution, adapted for GDP
+# (not GNI) and the actual data: the lower bound of each level above the first
+INCOME_BOUNDS = [3000, 9000, 25000]
+
+# Risk levels of a rate per 100K: a rate above a bound is in the next level
+RISK_LEVELS = ['MODERATE', 'ELEVATED', 'HIGH', 'CRISIS']
+RISK_BOUNDS = [10, 20, 30]
+
+
+def income_levels(gdp):
+    """Income level of each GDP per capita value, as an object array"""
+    # side='right': a GDP equal to a bound is in the level above it. NaN sorts
+    # past every bound, so it falls into 'High Income'.
+    return np.asarray(INCOME_ORDER, dtype=object)[np.searchsorted(INCOME_BOUNDS, gdp, side='right')]
+
+
+def risk_levels(rates):
+    """Risk level of each rate per 100K, as an object array; NaN is 'MODERATE'"""
+    rates = np.asarray(rates, dtype='float64')
+    levels = np.searchsorted(RISK_BOUNDS, rates, side='left')
+    levels[np.isnan(rates)] = 0
+    return np.asarray(RISK_LEVELS, dtype=object)[levels]
+
+
+@memoize()
+def selection(backend, state):
+    """The backend's selection of the data matching the filter state"""
+    return backend.select(state)
+
+
+@memoize()
+def country_rates(backend, state):
+    """Per-country totals and rates, shared by the map, KPIs and top-10"""
+    return backend.rollup(['Country'], selection(backend, state))
+
+
+@memoize()
+def kpis(backend, state):
+    """Values of the key metric cards"""
+    totals = backend.totals(selection(backend, state))
+    return {
+        'total_suicides': totals['Suicides Count'],
+        'avg_rate': totals['Suicides/100K Population'],
+        'total_population': totals['Population'],
+        'countries_count': len(country_rates(backend, state)),
+        'years_span': state.years[1] - state.years[0] + 1,
+    }
+
+
+@memoize()
+def age_sex_rates(backend, state):
+    """Rates per age group and sex, in age order"""
+    age_data = backend.rollup(['Age', 'Sex'], selection(backend, state))
+    age_data['Age'] = pd.Categorical(age_data['Age'], categories=AGE_ORDER, ordered=True)
+    return age_data.sort_values('Age')
+
+
+@memoize()
+def gender_trends(backend, state):
+    """Yearly rates per sex, plus the male/female pivot when both are present"""
+    trends = backend.rollup(['Year', 'Sex'], selection(backend, state))
+
+    # Pivot to calculate male-to-female ratio
+    pivot = trends.pivot(index='Year', columns='Sex', values='Rate per 100K').reset_index()
+    if 'Male' in pivot.columns and 'Female' in pivot.columns:
+        pivot['Male-to-Female Ratio'] = pivot['Male'] / pivot['Female']
+        pivot['Gender Gap'] = pivot['Male'] - pivot['Female']
+    else:
+        pivot = None
+    return trends, pivot
+
+
+@memoize()
+def time_trends(backend, state):
+    """Country-year rates for the Time Trends view, and its chart title"""
+    # Aggregate by country and year
+    trend_summary = backend.rollup(['Country', 'Year'], selection(backend, state))
+
+    if state.countries is None or len(state.countries) > 10:
+        # If too many countries, show top 10 by average rate
+        country_data = country_rates(backend, state)
+        avg_rates = country_data.set_index('Country')['Suicides/100K Population'].sort_values(ascending=False)
+        top_countries_list = avg_rates.head(10).index.tolist()
+        trend_summary = trend_summary[trend_summary['Country'].isin(top_countries_list)].reset_index(drop=True)
+        chart_title = "Top 10 Countries - Trends Over Time"
+    else:
+        chart_title = "Selected Countries - Trends Over Time"
+
+    trend_summary['Income Level'] = income_levels(trend_summary['GDP Per Capita ($)'])
+    return trend_summary, chart_title
+
+
+def _income_scatter_data(data):
+    """Add income levels and marker sizes to a GDP scatter table"""
+    data['Income Level'] = income_levels(data['GDP Per Capita ($)'])
+
+    # Get only the income levels present in the filtered data
+    present_income_levels = data['Income Level'].unique()
+    present_income_order = [level for level in INCOME_ORDER if level in present_income_levels]
+
+    # Create color map with only present income levels
+    color_map = {k: v for k, v in INCOME_COLORS.items() if k in present_income_levels}
+
+    data['Income Level'] = pd.Categorical(data['Income Level'], categories=present_income_order, ordered=True)
+
+    # Make size proportional to the rate itself for better visualization
+    data['Size'] = data['Rate per 100K'] ** 1.5  # Use power to make differences more visible
+    return data, present_income_order, color_map
+
+
+@memoize()
+def gdp_correlation(backend, state):
+    """Country-year GDP vs rate table, its income order and color map"""
+    gdp_data = backend.rollup(['Country', 'Year'], selection(backend, state))
+    return _income_scatter_data(gdp_data)
+
+
+@memoize()
+def country_overview(backend, state):
+    """One row per country for the Country Overview, with income order and colors"""
+    # Average across all years for each country
+    return _income_scatter_data(country_rates(backend, state).copy())
+
+
+@memoize()
+def top_countries(backend, state):
+    """The ten countries with the highest rates, with their risk level"""
+    top = country_rates(backend, state).nlargest(10, 'Rate per 100K')
+
+    # Add risk categorization
+    top['Risk Level'] = risk_levels(top['Rate per 100K'])
+    return top
+
+
+@memoize()
+def series_trends(backend, state, dims):
+    """Linear and log-linear trend of every `dims` series over the selected years"""
+    table = backend.rollup(list(dims) + ['Year'], selection(backend, state))
+
+    # A country-year without a single recorded suicide is a gap in reporting,
+    # not a zero rate, so it is left out of every series of that country
+    totals = backend.rollup(['Country', 'Year'], selection(backend, state))
+    unreported = totals.loc[totals['Suicides Count'] == 0, ['Country', 'Year']]
+    if not unreported.empty:
+        country_years = pd.MultiIndex.from_frame(table[['Country', 'Year']])
+        table = table[~country_years.isin(pd.MultiIndex.from_frame(unreported))]
+    return trends.trend_table(table, list(dims))
+
+
+@memoize()
+def fastest_rising(backend, state):
+    """The ten fastest-rising countries with their steepest group, and a title"""
+    countries = series_trends(backend, state, ('Country',))
+    rising = countries.dropna(subset=['Slope per Year']).nlargest(10, 'Slope per Year')
+
+    # The sex and age group rising fastest within each country
+    groups = series_trends(backend, state, ('Country', 'Sex', 'Age'))
+    steepest = groups.dropna(subset=['Slope per Year']).sort_values('Slope per Year', ascending=False)
+    steepest = steepest.drop_duplicates('Country')
+    steepest['Steepest Group'] = steepest['Sex'].astype(str) + ' ' + steepest['Age'].astype(str)
+    rising = rising.merge(steepest[['Country', 'Steepest Group']], on='Country', how='left')
+
+    if rising.empty:
+        chart_title = f"Fastest-Rising Countries - needs {trends.MIN_YEARS}+ years of data"
+    else:
+        chart_title = f"Fastest-Rising Countries - Rate Change per Year, {trends.CONFIDENCE:.0%} CI"
+    return rising, chart_title
+
+
+def economic_view(backend, state, econ_view):
+    """The aggregate behind the selected Economic Factors view"""
+    if econ_view == "Time Trends":
+        return time_trends(backend, state)
+    if econ_view == "GDP Correlation":
+        return gdp_correlation(backend, state)
+    if econ_view == "Fastest Rising":
+        return fastest_rising(backend, state)
+    return country_overview(backend, state)
@@ -0,0 +1,338 @@
+"""Local JSON API over the panel aggregates.
+
+Serves the tables behind the dashboard panels to scripts and other tools,
+without a browser session per consumer. Requests take the sidebar's filters
+in the same query parameters as a shared dashboard link (see url_state):
+
+    GET /api/countries?country=Japan&country=France&years=2000-2010&sex=Female
+
+Endpoints (ENDPOINTS): ``kpis``, ``age-sex``, ``countries``, ``gender``
+(yearly rates per sex and the male/female ratio), ``income`` (countries and
+totals per income level), ``top`` and ``trends`` (linear and log-linear
+trend of every country and country/sex/age series, see dashboard.trends);
+``/api/options`` lists the filter values and ``/api`` the endpoints.
+
+Every response body is encoded once per (dataset, filter state, endpoint) and
+kept in the process-wide memo, next to the aggregates it is built from. It
+carries a strong ETag over its bytes, so clients that send If-None-Match get
+a 304 until the data or their filters change.
+
+The API has no authentication: anyone who can reach its port reads every
+aggregate that the app only shows after sign-in. It therefore binds to
+loopback (DASHBOARD_API_HOST defaults to 127.0.0.1) and refuses any other
+host unless DASHBOARD_API_PUBLIC is set, in which case it logs a warning;
+put it behind an authenticating proxy before opening it up.
+
+Setting DASHBOARD_API_PORT starts the server in a daemon thread of the
+Streamlit process (on the app's first run, or at boot under
+``python -m dashboard.prewarm``), where it shares the aggregate memo and the
+live dataset with every session. ``python -m dashboard.api [--host H]
+[--port P]`` runs it on its own.
+"""
+import argparse
+import hashlib
+import ipaddress
+import json
+import logging
+import math
+import socket
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from dashboard import aggregates, cli, settings, url_state
+from dashboard.aggregates import AGE_ORDER, INCOME_ORDER, make_filter_state
+from dashboard.ingest import live_dataset
+from dashboard.memo import memoize
+
+logger = logging.getLogger(__name__)
+
+PREFIX = '/api'
+
+# Working columns of the aggregate tables that are not part of the API
+INTERNAL_COLUMNS = ['Rate Sum', 'GDP Sum', 'Rows', 'Size']
+
+
+def _records(table):
+    """JSON array of a table's rows, without the internal columns"""
+    return table.drop(columns=INTERNAL_COLUMNS, errors='ignore').to_json(orient='records')
+
+
+def _kpis(backend, state):
+    kpis = {name: _plain(value) for name, value in aggregates.kpis(backend, state).items()}
+    return json.dumps(kpis, allow_nan=False)
+
+
+def _age_sex(backend, state):
+    return _records(aggregates.age_sex_rates(backend, state))
+
+
+def _countries(backend, state):
+    return _records(aggregates.country_rates(backend, state))
+
+
+def _gender(backend, state):
+    trends, pivot = aggregates.gender_trends(backend, state)
+    ratio = 'null' if pivot is None else _records(pivot)
+    return f'{{"trends":{_records(trends)},"ratio":{ratio}}}'
+
+
+def _income(backend, state):
+    data, _, _ = aggregates.country_overview(backend, state)
+    levels = data.groupby('Income Level', observed=True).agg(
+        **{
+            'Countries': ('Country', 'size'),
+            'Suicides Count': ('Suicides Count', 'sum'),
+            'Population': ('Population', 'sum'),
+        }
+    )
+    levels['Rate per 100K'] = levels['Suicides Count'] / levels['Population'] * 100000
+    levels = levels.reindex([level for level in INCOME_ORDER if level in levels.index]).reset_index()
+    return f'{{"levels":{_records(levels)},"countries":{_records(data)}}}'
+
+
+def _top(backend, state):
+    return _records(aggregates.top_countries(backend, state))
+
+
+def _trends(backend, state):
+    countries = aggregates.series_trends(backend, state, ('Country',))
+    series = aggregates.series_trends(backend, state, ('Country', 'Sex', 'Age'))
+    return f'{{"countries":{_records(countries)},"series":{_records(series)}}}'
+
+
+# Endpoint name -> function(backend, state) returning the JSON of its data
+ENDPOINTS = {
+    'kpis': _kpis,
+    'age-sex': _age_sex,
+    'countries': _countries,
+    'gender': _gender,
+    'income': _income,
+    'top': _top,
+    'trends': _trends,
+}
+
+
+def _plain(value):
+    """A KPI value as a JSON-ready Python value; NaN and infinities become None (null)"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+# (backend token, options) of the latest dataset seen, see options()
+_options = (None, None)
+
+
+def options(df, backend):
+    """The filter values the sidebar offers, as (countries, years, sexes, ages).
+
+    Computed once per dataset version rather than on every request.
+    """
+    global _options
+    token, values = _options
+    if token != backend.token:
+        countries = ['All'] + sorted(df['Country'].unique().tolist())
+        years = (int(df['Year'].min()), int(df['Year'].max()))
+        values = countries, years, df['Sex'].unique().tolist(), AGE_ORDER
+        _options = (backend.token, values)
+    return values
+
+
+def filter_state(params, df, backend):
+    """The canonical FilterState of request query parameters.
+
+    Parameters are read like a shared link: missing filters take the
+    sidebar's defaults and unknown values are dropped.
+    """
+    countries, years, sexes, ages = options(df, backend)
+    shared = url_state.from_params(params, countries, years, sexes, ages)
+    return make_filter_state(
+        shared.get('countries', ['All']), shared.get('year_range', years),
+        shared.get('sex', sexes), shared.get('ages', ages)
+    )
+
+
+@memoize()
+def response(backend, state, endpoint):
+    """(ETag, body) of an endpoint for a filter state, encoded once.
+
+    The body echoes the filters the data was computed for, after defaults
+    and dropped values were applied.
+    """
+    filters = json.dumps({
+        'country': ['All'] if state.countries is None else list(state.countries),
+        'years': list(state.years),
+        'sex': list(state.sexes),
+        'age': list(state.ages),
+    })
+    data = ENDPOINTS[endpoint](backend, state)
+    body = f'{{"endpoint":{json.dumps(endpoint)},"filters":{filters},"data":{data}}}'.encode()
+    return _etag(body), body
+
+
+class Handler(BaseHTTPRequestHandler):
+    """GET and HEAD of the API endpoints"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; with Nagle on, keep-alive clients
+    # wait out a delayed ACK between them on every response
+    disable_nagle_algorithm = True
+    server_version = 'SuicideDashboardAPI'
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')
+        if path != PREFIX and not path.startswith(PREFIX + '/'):
+            return self._error(HTTPStatus.NOT_FOUND, f'unknown path {url.path}', send_body)
+        endpoint = path[len(PREFIX) + 1:]
+
+        try:
+            df, backend, _ = live_dataset().snapshot()
+        except FileNotFoundError as exc:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, f'dataset not found: {exc}', send_body)
+
+        if endpoint == '':
+            body = json.dumps({'endpoints': sorted(ENDPOINTS) + ['options'],
+                               'params': list(url_state.PARAMS)}).encode()
+            return self._send(HTTPStatus.OK, body, _etag(body), send_body)
+        if endpoint == 'options':
+            countries, years, sexes, ages = options(df, backend)
+            body = json.dumps({'country': countries[1:], 'years': list(years),
+                               'sex': sexes, 'age': ages}).encode()
+            return self._send(HTTPStatus.OK, body, _etag(body), send_body)
+        if endpoint not in ENDPOINTS:
+            return self._error(HTTPStatus.NOT_FOUND, f'unknown endpoint {endpoint!r}', send_body)
+
+        params = parse_qs(url.query, keep_blank_values=True)
+        state = filter_state({name: params[name] for name in url_state.PARAMS if name in params}, df, backend)
+        try:
+            etag, body = response(backend, state, endpoint)
+        except Exception:
+            logger.exception("api: %s failed for %s", endpoint, state)
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, 'aggregate failed', send_body)
+        self._send(HTTPStatus.OK, body, etag, send_body)
+
+    def _send(self, status, body, etag, send_body):
+        if etag is not None and _matches(etag, self.headers.get('If-None-Match')):
+            status, body = HTTPStatus.NOT_MODIFIED, b''
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            # Clients may keep a copy but revalidate it on every use
+            self.send_header('Cache-Control', 'no-cache')
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def _error(self, status, message, send_body):
+        body = json.dumps({'error': message}).encode()
+        self._send(status, body, None, send_body)
+
+    def log_message(self, format, *args):
+        logger.debug("api: %s " + format, self.address_string(), *args)
+
+
+def _matches(etag, if_none_match):
+    """Whether an If-None-Match header lists the ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in tags or etag in tags
+
+
+_server = None
+_lock = threading.Lock()
+
+
+def is_loopback(host):
+    """Whether every address `host` resolves to is a loopback address"""
+    try:
+        infos = socket.getaddrinfo(host or None, None, proto=socket.IPPROTO_TCP, flags=socket.AI_PASSIVE)
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(info[4][0].split('%')[0]).is_loopback for info in infos)
+
+
+def make_server(host=None, port=None, public=None):
+    """A threading API server bound to host:port (settings by default).
+
+    Raises ValueError for a host that is not loopback unless `public`
+    (settings.API_PUBLIC by default) allows it.
+    """
+    host = settings.API_HOST if host is None else host
+    public = settings.API_PUBLIC if public is None else public
+    if not is_loopback(host):
+        if not public:
+            raise ValueError(
+                f"refusing to serve the unauthenticated API on {host!r}, which is not a loopback "
+                f"address; set DASHBOARD_API_PUBLIC=1 to allow it"
+            )
+        logger.warning("api: serving on %r without authentication: every aggregate is readable "
+                       "by anyone who can reach this port", host)
+    server = ThreadingHTTPServer((host, settings.API_PORT if port is None else port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start():
+    """Serve the API from a daemon thread when API_PORT is set, once per process"""
+    global _server
+    with _lock:
+        if _server is not None or not settings.API_PORT:
+            return
+        try:
+            _server = make_server()
+        except (OSError, ValueError) as exc:
+            logger.error("api: cannot listen on %s:%s: %s", settings.API_HOST, settings.API_PORT, exc)
+            _server = False
+            return
+        threading.Thread(target=_server.serve_forever, name='api', daemon=True).start()
+        logger.info("api: serving on http://%s:%d%s", *_server.server_address[:2], PREFIX)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=settings.API_HOST)
+    parser.add_argument('--port', type=int, default=settings.API_PORT or 8502)
+    parser.add_argument('--public', action='store_true', default=settings.API_PUBLIC,
+                        help="allow a host other than loopback (the API has no authentication)")
+    args = parser.parse_args(argv)
+
+    cli.setup_logging()
+
+    try:
+        server = make_server(args.host, args.port, args.public)
+    except ValueError as exc:
+        parser.error(str(exc))
+    live_dataset()
+    logger.info("api: serving on http://%s:%d%s", args.host, args.port, PREFIX)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    cli.run('dashboard.api')
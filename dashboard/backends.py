@@ -0,0 +1,236 @@
+"""Query backends that answer the dashboard's filters and rollups.
+
+Every backend exposes the same small interface, which is all the panel
+aggregates use:
+
+* ``token``: identifies the backend and its data in memo keys
+* ``select(state)``: resolve a FilterState to a backend-specific selection
+* ``rollup(dims, selection)``: one row per observed combination of `dims`,
+  sorted by them, with the summed measures ('Suicides Count', 'Population',
+  'Rate Sum', 'GDP Sum', 'Rows') and the derived rate columns
+* ``totals(selection)``: grand totals of the selection as a dict
+* ``upsert(df, rows)``: a new backend over `df`, the dataset after `rows`
+  (every row of the country-years a delta touched) were upserted into it;
+  the backend itself stays valid for queries already running on it
+
+'pandas' answers from the in-memory cube, its filter indexes and its year
+prefix sums. 'polars' (lazy, multithreaded) and 'duckdb' (in-process SQL)
+aggregate the raw rows; they need the optional ``polars`` or ``duckdb``
+package installed.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from dashboard.cube import DIMENSIONS, Cube, derive_rates
+from dashboard.filter_engine import FilterIndex
+
+# Summed measures and the raw column each one sums
+MEASURE_COLUMNS = {
+    'Suicides Count': 'Suicides Count',
+    'Population': 'Population',
+    'Rate Sum': 'Suicides/100K Population',
+    'GDP Sum': 'GDP Per Capita ($)',
+}
+INTEGER_MEASURES = ['Suicides Count', 'Population', 'Rows']
+
+
+def _data_token(name, df):
+    """Memo token of a backend over a frame, from the source digest when known"""
+    digest = df.attrs.get('digest')
+    if digest is None:
+        hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        digest = hashlib.sha256(hashed.tobytes()).hexdigest()
+    return f'{name}-{digest[:16]}'
+
+
+def _rollup_frame(dims, columns):
+    """Normalize backend query results to the cube's rollup dtypes"""
+    result = {}
+    for dim in dims:
+        values = np.asarray(columns[dim])
+        result[dim] = values.astype(np.int64) if dim == 'Year' else values.astype(object)
+    for name in list(MEASURE_COLUMNS) + ['Rows']:
+        values = np.asarray(columns[name], dtype=float)
+        result[name] = values.round().astype(np.int64) if name in INTEGER_MEASURES else values
+    return derive_rates(pd.DataFrame(result))
+
+
+def _totals(count, population, rate_sum, rows):
+    return {
+        'Suicides Count': int(count or 0),
+        'Population': int(population or 0),
+        'Suicides/100K Population': float(rate_sum) / rows if rows else float('nan'),
+    }
+
+
+class CubeBackend:
+    """pandas/NumPy backend over the pre-aggregated cube"""
+
+    name = 'pandas'
+
+    def __init__(self, df, cube=None):
+        self.cube = Cube(df) if cube is None else cube
+        self.index = FilterIndex(self.cube)
+
+    @property
+    def token(self):
+        return self.cube.token
+
+    def select(self, state):
+        return self.index.resolve(
+            countries=state.countries,
+            year_range=state.years,
+            sexes=state.sexes,
+            ages=state.ages
+        )
+
+    def rollup(self, dims, selection):
+        # Without a Year breakdown the year range comes from the prefix sums
+        if 'Year' not in dims:
+            return self.cube.range_rollup(dims, selection.year_span, selection.codes)
+        return self.cube.rollup(dims, selection.positions)
+
+    def totals(self, selection):
+        return self.cube.range_totals(selection.year_span, selection.codes)
+
+    def upsert(self, df, rows):
+        # Only the touched country-years are re-aggregated
+        return CubeBackend(df, cube=self.cube.upsert(rows))
+
+
+class PolarsBackend:
+    """Lazy, multithreaded Polars queries over the raw rows"""
+
+    name = 'polars'
+
+    def __init__(self, df):
+        try:
+            import polars as pl
+        except ImportError as exc:
+            raise ImportError("the 'polars' backend needs the polars package") from exc
+        self._pl = pl
+        columns = DIMENSIONS + list(MEASURE_COLUMNS.values())
+        frame = pl.from_pandas(df[columns])
+        # The snapshot downcasts integers; widen them so sums cannot overflow
+        self.rows = frame.with_columns(
+            [pl.col(dim).cast(pl.String) for dim in ('Country', 'Sex', 'Age')]
+            + [pl.col(column).cast(pl.Int64) for column in ('Year', 'Suicides Count', 'Population')]
+        )
+        self.token = _data_token(self.name, df)
+
+    def select(self, state):
+        pl = self._pl
+        conditions = [pl.col('Year').is_between(state.years[0], state.years[1])]
+        for column, values in (('Country', state.countries), ('Sex', state.sexes), ('Age', state.ages)):
+            if values is not None:
+                conditions.append(pl.col(column).is_in(list(values)))
+        return self.rows.lazy().filter(pl.all_horizontal(conditions))
+
+    def _sums(self):
+        pl = self._pl
+        return [pl.col(column).cast(pl.Float64).sum().alias(name) for name, column in MEASURE_COLUMNS.items()] + [
+            pl.len().alias('Rows')
+        ]
+
+    def rollup(self, dims, selection):
+        if not dims:
+            summed = selection.select(self._sums()).collect()
+            summed = summed.filter(self._pl.col('Rows') > 0)
+        else:
+            summed = selection.group_by(dims).agg(self._sums()).sort(dims).collect()
+        return _rollup_frame(dims, {name: summed[name].to_numpy() for name in summed.columns})
+
+    def totals(self, selection):
+        pl = self._pl
+        summed = selection.select(
+            pl.col('Suicides Count').sum(),
+            pl.col('Population').sum(),
+            pl.col('Suicides/100K Population').sum(),
+            pl.len(),
+        ).collect().row(0)
+        return _totals(*summed)
+
+    def upsert(self, df, rows):
+        return PolarsBackend(df)
+
+
+class DuckDBBackend:
+    """In-process DuckDB SQL over the raw rows"""
+
+    name = 'duckdb'
+
+    def __init__(self, df):
+        try:
+            import duckdb
+        except ImportError as exc:
+            raise ImportError("the 'duckdb' backend needs the duckdb package") from exc
+        self._con = duckdb.connect()
+        source = df[DIMENSIONS + list(MEASURE_COLUMNS.values())]
+        self._con.register('source', source)
+        self._con.execute("""
+            CREATE TABLE rows AS
+            SELECT CAST("Country" AS VARCHAR) AS "Country", CAST("Year" AS BIGINT) AS "Year",
+                   CAST("Sex" AS VARCHAR) AS "Sex", CAST("Age" AS VARCHAR) AS "Age",
+                   "Suicides Count", "Population", "Suicides/100K Population", "GDP Per Capita ($)"
+            FROM source
+        """)
+        self._con.unregister('source')
+        self.token = _data_token(self.name, df)
+
+    def select(self, state):
+        clauses = ['"Year" BETWEEN ? AND ?']
+        params = [state.years[0], state.years[1]]
+        for column, values in (('Country', state.countries), ('Sex', state.sexes), ('Age', state.ages)):
+            if values is None:
+                continue
+            if not values:
+                clauses.append('FALSE')
+                continue
+            clauses.append(f'"{column}" IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        return ' AND '.join(clauses), tuple(params)
+
+    def _query(self, sql, params):
+        # A cursor per query: one DuckDB connection must not be shared by threads
+        return self._con.cursor().execute(sql, list(params))
+
+    def rollup(self, dims, selection):
+        where, params = selection
+        sums = ', '.join(
+            f'SUM(CAST("{column}" AS DOUBLE)) AS "{name}"' for name, column in MEASURE_COLUMNS.items()
+        )
+        keys = ', '.join(f'"{dim}"' for dim in dims)
+        if dims:
+            sql = f'SELECT {keys}, {sums}, COUNT(*) AS "Rows" FROM rows WHERE {where} GROUP BY {keys} ORDER BY {keys}'
+        else:
+            sql = f'SELECT {sums}, COUNT(*) AS "Rows" FROM rows WHERE {where} HAVING COUNT(*) > 0'
+        return _rollup_frame(dims, self._query(sql, params).fetchnumpy())
+
+    def totals(self, selection):
+        where, params = selection
+        sql = (
+            'SELECT SUM("Suicides Count"), SUM("Population"), SUM("Suicides/100K Population"), COUNT(*) '
+            f'FROM rows WHERE {where}'
+        )
+        return _totals(*self._query(sql, params).fetchone())
+
+    def upsert(self, df, rows):
+        return DuckDBBackend(df)
+
+
+BACKENDS = {
+    CubeBackend.name: CubeBackend,
+    PolarsBackend.name: PolarsBackend,
+    DuckDBBackend.name: DuckDBBackend,
+}
+
+
+def create_backend(name, df):
+    """Build the backend registered under `name` over the loaded dataset"""
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown backend {name!r}, expected one of {sorted(BACKENDS)}") from None
+    return backend(df)
@@ -0,0 +1,22 @@
+"""Shared plumbing of the ``python -m dashboard.<module>`` entry points."""
+import importlib
+import logging
+import sys
+
+
+def setup_logging(level=logging.INFO):
+    """Log the 'dashboard' loggers to stderr with timestamps"""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logging.getLogger('dashboard').addHandler(handler)
+    logging.getLogger('dashboard').setLevel(level)
+
+
+def run(module):
+    """Exit with the result of ``main()`` of a dashboard module run with -m.
+
+    The module is imported under its package name rather than run as
+    ``__main__``, so there is one copy of it: its logger is 'dashboard.<name>'
+    and its module state (threads, status, caches) is the one the app sees.
+    """
+    sys.exit(importlib.import_module(module).main())
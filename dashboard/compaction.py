@@ -0,0 +1,172 @@
+"""Compaction of figure specs before they are sent to the browser.
+
+st.plotly_chart ships every figure as JSON on each rerun, so ``compact()``
+rewrites a finished figure dict to draw the same chart from fewer bytes:
+
+* hover values with a known display precision (HOVER_FORMATS) get an
+  explicit format, and the customdata behind them is rounded to it
+* hover lines of internal columns (HOVER_HIDDEN, e.g. the marker Size) and
+  customdata columns no hover template refers to are dropped
+* float arrays that are plotted, or only shown through a format, are sent as
+  float32; Plotly serializes them as base64 typed arrays
+
+Frames of animated figures get the same treatment as the traces they update.
+The input spec is not modified; untouched parts are shared with the result.
+"""
+import re
+
+import numpy as np
+
+# Display format of hover values by their label
+HOVER_FORMATS = {
+    'Rate per 100K': '.2f',
+    'GDP Per Capita ($)': '$,.0f',
+    'Suicides Count': ',.0f',
+    'Population': ',.0f',
+}
+
+# Hover lines of columns that only drive the drawing
+HOVER_HIDDEN = {'Size'}
+
+# Plotted arrays that can go out as float32 (hover shows them formatted)
+FLOAT32_PATHS = [('x',), ('y',), ('z',), ('marker', 'size'), ('marker', 'color')]
+
+_EXTRA = re.compile(r'<extra>.*</extra>$')
+_FIELD_LINE = re.compile(r'^(?P<label>[^<>=]+)=%\{(?P<field>[^}:]+)(?::(?P<format>[^}]*))?\}$')
+_CUSTOMDATA = re.compile(r'%\{customdata\[(\d+)\](?::([^}]*))?\}')
+_DECIMALS = re.compile(r'\.(\d+)[f%]')
+
+
+def _hover_template(template):
+    """Format known hover values and drop the hidden ones"""
+    extra = _EXTRA.search(template)
+    body = template[:extra.start()] if extra else template
+    lines = []
+    for line in body.split('<br>'):
+        match = _FIELD_LINE.match(line)
+        if match and match['label'] in HOVER_HIDDEN:
+            continue
+        if match and match['format'] is None and match['label'] in HOVER_FORMATS:
+            line = f"{match['label']}=%{{{match['field']}:{HOVER_FORMATS[match['label']]}}}"
+        lines.append(line)
+    return '<br>'.join(lines) + (extra.group(0) if extra else '')
+
+
+def _decimals(number_format):
+    """Decimal places a d3 number format shows, None when unknown"""
+    if not number_format:
+        return None
+    match = _DECIMALS.search(number_format)
+    if match:
+        return int(match.group(1))
+    return 0 if number_format.endswith(('d', ',')) else None
+
+
+def _customdata_plan(template, n_columns):
+    """Columns of customdata a template uses, their decimals and the new template"""
+    used = {}
+    for match in _CUSTOMDATA.finditer(template):
+        used.setdefault(int(match.group(1)), _decimals(match.group(2)))
+    keep = sorted(column for column in used if column < n_columns)
+    renumber = {old: new for new, old in enumerate(keep)}
+    template = _CUSTOMDATA.sub(
+        lambda m: m.group(0).replace(f'[{m.group(1)}]', f'[{renumber.get(int(m.group(1)), m.group(1))}]'),
+        template
+    )
+    return keep, [used[column] for column in keep], template
+
+
+def _round_column(values, decimals):
+    """Round a numeric customdata column; other columns pass unchanged"""
+    if decimals is None:
+        return values
+    try:
+        numbers = values.astype(float)
+    except (TypeError, ValueError):
+        return values
+    if not np.all(np.isfinite(numbers)):
+        return values
+    numbers = numbers.round(decimals)
+    if decimals == 0 and np.all(np.abs(numbers) <= np.iinfo(np.int32).max):
+        numbers = numbers.astype(np.int64)
+    return numbers.astype(object) if values.dtype == object else numbers
+
+
+def _compact_customdata(customdata, keep, decimals):
+    customdata = np.asarray(customdata)
+    columns = [_round_column(customdata[:, column], places) for column, places in zip(keep, decimals)]
+    if not columns:
+        return None
+    if customdata.dtype == object:
+        compacted = np.empty((len(customdata), len(columns)), dtype=object)
+        for i, column in enumerate(columns):
+            compacted[:, i] = column
+        return compacted
+    return np.column_stack(columns)
+
+
+def _float32(values):
+    """A float64 array as float32, when it fits; anything else unchanged"""
+    if not isinstance(values, np.ndarray) or values.dtype != np.float64 or values.size == 0:
+        return values
+    finite = values[np.isfinite(values)]
+    if finite.size and np.abs(finite).max() > np.finfo(np.float32).max:
+        return values
+    return values.astype(np.float32)
+
+
+def _compact_arrays(trace):
+    for path in FLOAT32_PATHS:
+        parent = trace
+        for key in path[:-1]:
+            parent = parent.get(key)
+            if not isinstance(parent, dict):
+                break
+        else:
+            values = parent.get(path[-1])
+            compacted = _float32(values)
+            if compacted is not values:
+                if len(path) == 2:
+                    trace[path[0]] = parent = dict(parent)
+                parent[path[-1]] = compacted
+    return trace
+
+
+def _compact_trace(trace, plan):
+    trace = dict(trace)
+    keep, decimals = plan or (None, None)
+    if keep is not None and trace.get('customdata') is not None:
+        customdata = _compact_customdata(trace['customdata'], keep, decimals)
+        if customdata is None:
+            trace.pop('customdata')
+        else:
+            trace['customdata'] = customdata
+    return _compact_arrays(trace)
+
+
+def compact(spec):
+    """Return a compacted copy of a figure dict, see the module docstring"""
+    traces, plans = [], []
+    for trace in spec['data']:
+        plan = None
+        template = trace.get('hovertemplate')
+        if template is not None:
+            template = _hover_template(template)
+            customdata = trace.get('customdata')
+            if customdata is not None and np.ndim(customdata) == 2:
+                keep, decimals, template = _customdata_plan(template, np.shape(customdata)[1])
+                plan = (keep, decimals)
+            trace = dict(trace, hovertemplate=template)
+        plans.append(plan)
+        traces.append(_compact_trace(trace, plan))
+
+    compacted = dict(spec, data=traces)
+    if spec.get('frames'):
+        compacted['frames'] = [
+            dict(frame, data=[
+                _compact_trace(trace, plans[i] if i < len(plans) else None)
+                for i, trace in enumerate(frame['data'])
+            ])
+            for frame in spec['frames']
+        ]
+    return compacted
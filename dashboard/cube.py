@@ -0,0 +1,244 @@
+"""Pre-aggregated Country x Year x Sex x Age cube behind every panel.
+
+The raw rows carry Generation as an extra dimension; the cube sums it away
+so every panel and KPI card is answered by rolling up cube cells instead of
+rescanning the row set. Rollups without a Year breakdown use cumulative sums
+over the years instead, so a year range costs two slices per series.
+"""
+import hashlib
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['Country', 'Year', 'Sex', 'Age']
+
+# Cells are keyed Year-first, so they come out ordered by year
+CELL_ORDER = ['Year', 'Country', 'Sex', 'Age']
+
+# Dimensions of the series the year prefix sums run along
+SERIES = ['Country', 'Sex', 'Age']
+
+
+def derive_rates(frame):
+    """Add the rate and average columns the panels draw to a rollup of sums"""
+    frame['Rate per 100K'] = (frame['Suicides Count'] / frame['Population']) * 100000
+    frame['Suicides/100K Population'] = frame['Rate Sum'] / frame['Rows']
+    frame['GDP Per Capita ($)'] = frame['GDP Sum'] / frame['Rows']
+    return frame
+
+
+class Cube:
+    """Summed measures at the Country x Year x Sex x Age grain.
+
+    Besides the summed counts and population, every cell keeps the sum of the
+    row-level rates and GDP values plus the number of source rows, so the
+    row-level averages the dashboard shows (average rate per 100K, average
+    GDP per capita) still roll up exactly.
+    """
+
+    def __init__(self, df):
+        self.labels = {}
+        row_codes = {}
+        for dim in DIMENSIONS:
+            categorical = pd.Categorical(df[dim])
+            labels = categorical.categories.to_numpy()
+            if np.issubdtype(labels.dtype, np.integer):
+                labels = labels.astype(np.int64)
+            self.labels[dim] = labels
+            row_codes[dim] = categorical.codes
+
+        # Rows with a missing dimension value cannot be placed in a cell
+        valid = np.logical_and.reduce([row_codes[dim] >= 0 for dim in DIMENSIONS])
+        shape = [len(self.labels[dim]) for dim in CELL_ORDER]
+        row_keys = np.ravel_multi_index([row_codes[dim][valid] for dim in CELL_ORDER], shape)
+        cell_keys, cell_of_row = np.unique(row_keys, return_inverse=True)
+
+        self.codes = {
+            dim: codes.astype(np.int32)
+            for dim, codes in zip(CELL_ORDER, np.unravel_index(cell_keys, shape))
+        }
+
+        def cell_sum(column):
+            values = df[column].to_numpy()[valid]
+            return np.bincount(cell_of_row, weights=values, minlength=len(cell_keys))
+
+        self.measures = {
+            'Suicides Count': cell_sum('Suicides Count').round().astype(np.int64),
+            'Population': cell_sum('Population').round().astype(np.int64),
+            'Rate Sum': cell_sum('Suicides/100K Population'),
+            'GDP Sum': cell_sum('GDP Per Capita ($)'),
+            'Rows': np.bincount(cell_of_row, minlength=len(cell_keys)),
+        }
+
+        self._freeze()
+        self.token = self._fingerprint()
+
+    def _freeze(self):
+        """Write-protect the arrays; one cube is shared by every session"""
+        for arrays in (self.labels, self.codes, self.measures):
+            for values in arrays.values():
+                values.flags.writeable = False
+
+    def _fingerprint(self):
+        """Identifies the cube contents in cache keys shared across sessions"""
+        digest = hashlib.sha256()
+        for dim in CELL_ORDER:
+            digest.update(np.ascontiguousarray(self.labels[dim]).astype(str).tobytes())
+            digest.update(self.codes[dim].tobytes())
+        for values in self.measures.values():
+            digest.update(values.tobytes())
+        return digest.hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.measures['Rows'])
+
+    def upsert(self, rows):
+        """Return a new cube with the country-years of `rows` rebuilt from them.
+
+        `rows` must hold every source row of each country-year it touches.
+        Only those rows are aggregated; the other cells are carried over and
+        the new cells are merged into them, so the result stays in year order.
+        The cube itself is left unchanged for readers still holding it.
+        """
+        patch = Cube(rows)
+        labels = {dim: np.union1d(self.labels[dim], patch.labels[dim]) for dim in CELL_ORDER}
+        shape = [len(labels[dim]) for dim in CELL_ORDER]
+
+        def recode(cube):
+            # Labels are sorted, so remapped codes keep the cells' key order
+            return {
+                dim: np.searchsorted(labels[dim], cube.labels[dim])[cube.codes[dim]].astype(np.int32)
+                for dim in CELL_ORDER
+            }
+
+        old_codes, new_codes = recode(self), recode(patch)
+        old_keys = np.ravel_multi_index([old_codes[dim] for dim in CELL_ORDER], shape)
+        new_keys = np.ravel_multi_index([new_codes[dim] for dim in CELL_ORDER], shape)
+
+        # Drop every cell of a touched country-year, then merge the patch in
+        def country_years(codes):
+            return codes['Year'].astype(np.int64) * shape[1] + codes['Country']
+
+        keep = ~np.isin(country_years(old_codes), country_years(new_codes))
+        at = np.searchsorted(old_keys[keep], new_keys)
+
+        cube = Cube.__new__(Cube)
+        cube.labels = labels
+        cube.codes = {dim: np.insert(old_codes[dim][keep], at, new_codes[dim]) for dim in CELL_ORDER}
+        cube.measures = {
+            name: np.insert(values[keep], at, patch.measures[name])
+            for name, values in self.measures.items()
+        }
+        cube._freeze()
+        cube.token = cube._fingerprint()
+        return cube
+
+    def rollup(self, dims, positions=None):
+        """Sum the cells over every dimension not listed in `dims`.
+
+        Returns one row per observed combination of `dims`, ordered like a
+        pandas groupby, with the summed measures and the derived
+        'Rate per 100K', 'Suicides/100K Population' (mean of the row rates)
+        and 'GDP Per Capita ($)' (mean of the row values) columns.
+        """
+        sizes = [len(self.labels[dim]) for dim in dims]
+        n_groups = int(np.prod(sizes))
+        if positions is None:
+            positions = slice(None)
+
+        if dims:
+            keys = np.ravel_multi_index([self.codes[dim][positions] for dim in dims], sizes)
+        else:
+            keys = np.zeros(len(self.measures['Rows'][positions]), dtype=np.intp)
+
+        rows = np.bincount(keys, weights=self.measures['Rows'][positions], minlength=n_groups)
+        observed = np.flatnonzero(rows)
+
+        result = {}
+        for dim, codes in zip(dims, np.unravel_index(observed, sizes)):
+            result[dim] = self.labels[dim][codes]
+        for name, values in self.measures.items():
+            sums = np.bincount(keys, weights=values[positions], minlength=n_groups)[observed]
+            if values.dtype.kind == 'i':
+                sums = sums.round().astype(np.int64)
+            result[name] = sums
+
+        return derive_rates(pd.DataFrame(result))
+
+    @cached_property
+    def year_prefix(self):
+        """Cumulative sums of every measure over the years, per series.
+
+        ``year_prefix[name][y, c, s, a]`` is the sum of the measure over the
+        first y years of country c, sex s and age a, so the sums over any
+        contiguous range of years are the difference of two slices.
+        """
+        shape = [len(self.labels['Year']) + 1] + [len(self.labels[dim]) for dim in SERIES]
+        cells = (self.codes['Year'] + 1,) + tuple(self.codes[dim] for dim in SERIES)
+        prefix = {}
+        for name, values in self.measures.items():
+            dense = np.zeros(shape, dtype=np.int64 if values.dtype.kind == 'i' else np.float64)
+            dense[cells] = values
+            np.cumsum(dense, axis=0, out=dense)
+            dense.flags.writeable = False
+            prefix[name] = dense
+        return prefix
+
+    def _range_sums(self, dims, year_span, codes):
+        """Summed measures per combination of `dims` from the year prefix sums"""
+        start, stop = year_span
+        kept = [dim for dim in SERIES if dim in dims]
+        summed_axes = tuple(axis for axis, dim in enumerate(SERIES) if dim not in dims)
+        order = [kept.index(dim) for dim in dims]
+
+        sums = {}
+        for name, prefix in self.year_prefix.items():
+            last, first = prefix[stop], prefix[start]
+            for axis, dim in enumerate(SERIES):
+                if codes.get(dim) is not None:
+                    last, first = last.take(codes[dim], axis=axis), first.take(codes[dim], axis=axis)
+            block = last - first
+            sums[name] = block.sum(axis=summed_axes).transpose(order).ravel()
+
+        observed = np.flatnonzero(sums['Rows'])
+        shape = [len(self.labels[dim]) if codes.get(dim) is None else len(codes[dim]) for dim in dims]
+        groups = {}
+        for dim, positions in zip(dims, np.unravel_index(observed, shape) if dims else ()):
+            if codes.get(dim) is not None:
+                positions = codes[dim][positions]
+            groups[dim] = self.labels[dim][positions]
+        return groups, {name: values[observed] for name, values in sums.items()}
+
+    def range_rollup(self, dims, year_span, codes):
+        """rollup() of a contiguous range of years, from the year prefix sums.
+
+        `dims` must not include 'Year'. `year_span` is the (start, stop) range
+        of positions in the Year labels, `codes` maps 'Country', 'Sex' and
+        'Age' to the sorted label codes to keep (None or absent keeps all).
+        The cost depends on the number of series, not on years or cells.
+        """
+        groups, sums = self._range_sums(dims, year_span, codes)
+        return derive_rates(pd.DataFrame({**groups, **sums}))
+
+    def range_totals(self, year_span, codes):
+        """totals() of a contiguous range of years, see range_rollup()"""
+        _, sums = self._range_sums([], year_span, codes)
+        rows = int(sums['Rows'].sum())
+        return {
+            'Suicides Count': int(sums['Suicides Count'].sum()),
+            'Population': int(sums['Population'].sum()),
+            'Suicides/100K Population': float(sums['Rate Sum'].sum()) / rows if rows else float('nan'),
+        }
+
+    def totals(self, positions=None):
+        """Return the grand totals of the selected cells as a dict"""
+        if positions is None:
+            positions = slice(None)
+        rows = int(self.measures['Rows'][positions].sum())
+        rate_sum = float(self.measures['Rate Sum'][positions].sum())
+        return {
+            'Suicides Count': int(self.measures['Suicides Count'][positions].sum()),
+            'Population': int(self.measures['Population'][positions].sum()),
+            'Suicides/100K Population': rate_sum / rows if rows else float('nan'),
+        }
@@ -0,0 +1,195 @@
+"""Typed columnar snapshot of the dashboard CSV.
+
+The first load of a CSV parses it with pandas and cleans it once (see
+``clean()``: schema validation and normalized text values), stores every
+text column as categorical codes plus a category list, downcasts the integer
+columns and writes one ``.npy`` file per column under
+``.snapshots/<content hash>/``. Later loads of the same file content
+memory-map those cleaned arrays instead of parsing the CSV again, so a cold
+start only costs hashing the file.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dashboard import settings
+
+SNAPSHOT_DIR = settings.BASE_DIR / '.snapshots'
+
+# Bump whenever the on-disk layout, the encoding of a column or the cleaning changes
+SNAPSHOT_VERSION = 2
+
+# Columns of the dataset, in order; rows are keyed on KEY
+KEY = ['Country', 'Year', 'Sex', 'Age']
+TEXT_COLUMNS = ['Country', 'Sex', 'Age', 'Generation']
+INTEGER_COLUMNS = ['Year', 'Suicides Count', 'Population']
+FLOAT_COLUMNS = ['Suicides/100K Population', 'GDP Per Capita ($)']
+COLUMNS = KEY + ['Suicides Count', 'Population', 'Suicides/100K Population', 'GDP Per Capita ($)', 'Generation']
+
+# Known typos in category labels, corrected when data is cleaned
+CATEGORY_FIXES = {'Generation': {'Millenials': 'Millennials'}}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(df):
+    """Split a parsed frame into typed column arrays plus their metadata"""
+    arrays = {}
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {'name': name, 'file': f'col{i}.npy'}
+        if pd.api.types.is_integer_dtype(series):
+            arrays[entry['file']] = pd.to_numeric(series, downcast='integer').to_numpy()
+        elif pd.api.types.is_numeric_dtype(series):
+            arrays[entry['file']] = series.to_numpy()
+        else:
+            # Text columns become small integer codes into a sorted category list
+            categorical = pd.Categorical(series)
+            arrays[entry['file']] = categorical.codes
+            entry['categories'] = categorical.categories.tolist()
+        columns.append(entry)
+    meta = {'version': SNAPSHOT_VERSION, 'rows': len(df), 'columns': columns}
+    return arrays, meta
+
+
+def _decode(arrays, meta):
+    """Rebuild a read-only DataFrame around the column arrays without copying them"""
+    data = {}
+    for entry in meta['columns']:
+        values = arrays[entry['file']]
+        # The frame is shared by every session; memory-mapped columns already are read-only
+        values.flags.writeable = False
+        if 'categories' in entry:
+            dtype = pd.CategoricalDtype(entry['categories'])
+            values = pd.Categorical.from_codes(values, dtype=dtype)
+        data[entry['name']] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def clean(df, source):
+    """Validate a parsed CSV against the dataset schema and normalize it.
+
+    Keeps the COLUMNS (in order), strips text values and applies
+    CATEGORY_FIXES. Raises ValueError, naming `source`, when a column is
+    missing, a key value is empty, or a count is not a non-negative number.
+    """
+    missing = [column for column in COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"{source}: missing columns {missing}")
+    df = df[COLUMNS].copy()
+    if df[KEY].isna().any(axis=None):
+        raise ValueError(f"{source}: rows with an empty Country, Year, Sex or Age")
+    for column in INTEGER_COLUMNS + FLOAT_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='raise')
+    if (df[['Suicides Count', 'Population']] < 0).any(axis=None):
+        raise ValueError(f"{source}: negative Suicides Count or Population")
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].astype(str).str.strip().replace(CATEGORY_FIXES.get(column, {}))
+    return df
+
+
+def _write_snapshot(arrays, meta, target):
+    """Write the column files into a temp directory and move it into place"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix='.tmp-', dir=target.parent))
+    try:
+        for file_name, values in arrays.items():
+            np.save(tmp / file_name, values)
+        with open(tmp / 'meta.json', 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, target)
+    except OSError:
+        # Another process may have finished the same snapshot first
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not (target / 'meta.json').exists():
+            raise
+
+
+def _read_snapshot(target):
+    """Memory-map every column file of an existing snapshot"""
+    with open(target / 'meta.json') as f:
+        meta = json.load(f)
+    arrays = {
+        entry['file']: np.load(target / entry['file'], mmap_mode='r')
+        for entry in meta['columns']
+    }
+    return arrays, meta
+
+
+def _source_key(csv_path):
+    """Identifier of a source file by its resolved path, kept in snapshot metadata"""
+    return hashlib.sha256(str(Path(csv_path).resolve()).encode()).hexdigest()[:16]
+
+
+def _prune_snapshots(csv_path, keep):
+    """Remove snapshots of earlier contents of the same source file.
+
+    Sources are told apart by their resolved path, so files sharing a name
+    in different directories keep their own snapshots. Snapshots written
+    before the path was recorded are matched on the file name.
+    """
+    key = _source_key(csv_path)
+    for path in SNAPSHOT_DIR.glob('*'):
+        if path == keep or not path.is_dir() or path.name.startswith('.tmp-'):
+            continue
+        try:
+            with open(path / 'meta.json') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if 'source_key' in meta:
+            stale = meta['source_key'] == key
+        else:
+            stale = meta.get('source') == Path(csv_path).name
+        if stale:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_dataset(csv_path=None):
+    """Return the dataset, from the memory-mapped snapshot when one exists.
+
+    The frame is meant to be shared: its column arrays are write-protected
+    and it is cleaned (see ``clean()``). The SHA-256 digest of the CSV is
+    kept in ``df.attrs['digest']``. Raises FileNotFoundError when the CSV
+    itself is missing and ValueError when it does not fit the schema.
+    """
+    csv_path = Path(csv_path or settings.DATA_PATH)
+    digest = file_digest(csv_path)
+    target = SNAPSHOT_DIR / f'{digest[:16]}-v{SNAPSHOT_VERSION}'
+
+    if (target / 'meta.json').exists():
+        try:
+            df = _decode(*_read_snapshot(target))
+            df.attrs['digest'] = digest
+            return df
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(target, ignore_errors=True)
+
+    arrays, meta = _encode(clean(pd.read_csv(csv_path), csv_path.name))
+    meta['source'] = csv_path.name
+    meta['source_key'] = _source_key(csv_path)
+    meta['digest'] = digest
+    try:
+        _write_snapshot(arrays, meta, target)
+        _prune_snapshots(csv_path, keep=target)
+        arrays, meta = _read_snapshot(target)
+    except OSError:
+        # Read-only deployments still work, just without the snapshot
+        pass
+    df = _decode(arrays, meta)
+    df.attrs['digest'] = digest
+    return df
@@ -0,0 +1,259 @@
+"""Batch export of standalone per-country HTML reports.
+
+Renders, for every country and requested year range, the dashboard's KPI
+cards and country-level charts (the same memoized figure builders the panels
+use) into one HTML file, in parallel across worker processes:
+
+    python -m dashboard.export_reports --output reports --years 1985-2016 --years 2010-2016
+
+The dataset and the figure skeletons are loaded once, in the parent, before
+the pool forks: workers share those pages copy-on-write (the dataset columns
+are memory-mapped snapshot arrays, see data_store) instead of each loading
+its own. Every worker writes its reports straight to the output directory,
+chart by chart, and only hands a short summary back. Plotly's JavaScript is
+written once next to the reports, which reference it, plus an index.html.
+
+The in-memory cube backend is built before forking too. Polars and DuckDB
+keep thread pools and connections that do not survive a fork, so with those
+each worker builds its own backend over the inherited frame. On platforms
+without fork, each worker also loads the dataset in its initializer.
+"""
+import argparse
+import html
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from dashboard import aggregates, cli, figures, settings
+from dashboard.aggregates import AGE_ORDER, make_filter_state
+from dashboard.backends import create_backend
+from dashboard.data_store import load_dataset
+
+logger = logging.getLogger(__name__)
+
+PLOTLY_JS = 'plotly.min.js'
+
+# (title, function) pairs of the charts in a report, called as function(backend, state)
+REPORT_CHARTS = [
+    ("Suicide Rates by Age Group", figures.age_chart),
+    ("Gender Gap Analysis Over Time", figures.gender_chart),
+    ("Economic Factors: Time Trends",
+     lambda backend, state: figures.economic_chart(backend, state, "Time Trends", False)),
+    ("Economic Factors: GDP Correlation",
+     lambda backend, state: figures.economic_chart(backend, state, "GDP Correlation", False)),
+]
+
+_PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>
+    body {{ font-family: sans-serif; background-color: #f8f9fa; margin: 1rem 2rem; }}
+    .metrics {{ display: flex; gap: 0.4rem; }}
+    .metric-card {{
+        flex: 1; background: linear-gradient(135deg, #20b2aa, #008b8b); color: white;
+        padding: 0.8rem; border-radius: 8px; text-align: center; box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    }}
+    .metric-value {{ font-size: 1.5rem; font-weight: bold; margin: 0; }}
+    .metric-label {{ font-size: 0.75rem; margin: 0; opacity: 0.9; }}
+    .chart-container {{
+        background-color: white; padding: 0.5rem; border-radius: 8px;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.1); margin: 0.5rem 0;
+    }}
+    .chart-title {{ font-weight: bold; color: #008b8b; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+# Backends that can be built before forking and used by every worker
+FORK_SAFE_BACKENDS = {'pandas'}
+
+# (dataset, backend) of this process: set by the parent before forking and
+# completed by _init_worker in each worker; backend is None until then when
+# it is not fork-safe
+_shared = None
+
+
+def _slug(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def report_name(country, years):
+    """File name of the report of a country over a (first, last) year range"""
+    return f'{_slug(country)}_{years[0]}-{years[1]}.html'
+
+
+def _metric(label, value, note=None, color=None):
+    style = f' style="background: linear-gradient(135deg, {color}, #008b8b);"' if color else ''
+    note = f'<p class="metric-label">{note}</p>' if note else ''
+    return (f'<div class="metric-card"{style}><p class="metric-label">{label}</p>'
+            f'<p class="metric-value">{value}</p>{note}</div>')
+
+
+def _metrics_html(kpis, years):
+    """The KPI cards of the dashboard, for one country"""
+    avg_rate = kpis['avg_rate']
+    risk = 'HIGH RISK' if avg_rate > 20 else 'MODERATE' if avg_rate > 10 else 'LOW RISK'
+    cards = [
+        _metric("Total Suicides", f"{kpis['total_suicides']:,}"),
+        _metric("Avg Rate per 100K", f"{avg_rate:.1f}", risk, "#ff4444" if avg_rate > 20 else "#20b2aa"),
+        _metric("Total Population", f"{kpis['total_population'] / 1000000:.1f}M"),
+        _metric("Years Selected", kpis['years_span'], f"{years[0]}-{years[1]}"),
+    ]
+    return '<div class="metrics">' + ''.join(cards) + '</div>\n'
+
+
+def write_report(job):
+    """Render one (country, years, path) report into its file.
+
+    Returns (country, years, bytes written or None when the country has no
+    data in the range, seconds).
+    """
+    country, years, path = job
+    started = time.perf_counter()
+    df, backend = _shared
+    state = make_filter_state([country], years, df['Sex'].unique().tolist(), AGE_ORDER)
+    kpis = aggregates.kpis(backend, state)
+    if not kpis['countries_count']:
+        return country, years, None, time.perf_counter() - started
+
+    path = Path(path)
+    partial = path.with_name(path.name + '.partial')
+    title = html.escape(f"{country}: Suicide Statistics {years[0]}-{years[1]}")
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.write(_PAGE_HEAD.format(title=title, plotly_js=PLOTLY_JS))
+        f.write(_metrics_html(kpis, years))
+        for chart_title, function in REPORT_CHARTS:
+            chart = pio.to_html(function(backend, state), include_plotlyjs=False, full_html=False, validate=False)
+            f.write(f'<div class="chart-container"><div class="chart-title">{html.escape(chart_title)}</div>\n')
+            f.write(chart)
+            f.write('</div>\n')
+        f.write('</body>\n</html>\n')
+    os.replace(partial, path)
+    return country, years, path.stat().st_size, time.perf_counter() - started
+
+
+def _init_worker(data_path, backend_name):
+    global _shared
+    df, backend = _shared if _shared is not None else (load_dataset(data_path), None)
+    if backend is None:
+        backend = create_backend(backend_name, df)
+    _shared = (df, backend)
+
+
+def _write_index(output, done):
+    """index.html linking every report, grouped by year range"""
+    lines = [_PAGE_HEAD.format(title="Country Reports", plotly_js=PLOTLY_JS)]
+    for years in sorted({years for _, years in done}):
+        lines.append(f'<h2>{years[0]}-{years[1]}</h2>\n<ul>\n')
+        for country in sorted(country for country, span in done if span == years):
+            lines.append(f'<li><a href="{report_name(country, years)}">{html.escape(country)}</a></li>\n')
+        lines.append('</ul>\n')
+    lines.append('</body>\n</html>\n')
+    (output / 'index.html').write_text(''.join(lines), encoding='utf-8')
+
+
+def export(output, year_ranges=None, countries=None, workers=None, data_path=None, backend_name=None):
+    """Write the reports of every country and year range into `output`.
+
+    Year ranges default to the dataset's full span and countries to all of
+    them. Returns a summary dict of what was written.
+    """
+    global _shared
+    started = time.perf_counter()
+    data_path = settings.DATA_PATH if data_path is None else data_path
+    backend_name = settings.BACKEND if backend_name is None else backend_name
+    workers = workers or os.cpu_count() or 1
+
+    df = load_dataset(data_path)
+    _shared = (df, create_backend(backend_name, df) if backend_name in FORK_SAFE_BACKENDS else None)
+    bounds = (int(df['Year'].min()), int(df['Year'].max()))
+    clamped = []
+    for first, last in year_ranges or [bounds]:
+        first, last = max(first, bounds[0]), min(last, bounds[1])
+        if first > last:
+            logger.warning("export: no data in %d-%d, skipping the range", first, last)
+        elif (first, last) not in clamped:
+            clamped.append((first, last))
+    year_ranges = clamped
+    countries = countries or sorted(df['Country'].unique().tolist())
+
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    (output / PLOTLY_JS).write_text(get_plotlyjs(), encoding='utf-8')
+    jobs = [
+        (country, years, str(output / report_name(country, years)))
+        for years in year_ranges for country in countries
+    ]
+
+    # Built before forking, so workers inherit Plotly's first-use imports too
+    figures.skeletons()
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    logger.info("export: %d reports with %d %s workers", len(jobs), workers, context.get_start_method())
+
+    done, skipped, written = [], [], 0
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(data_path, backend_name)) as pool:
+        chunksize = max(1, len(jobs) // (workers * 8))
+        for country, years, size, seconds in pool.map(write_report, jobs, chunksize=chunksize):
+            if size is None:
+                skipped.append((country, years))
+                continue
+            done.append((country, years))
+            written += size
+            if len(done) % 25 == 0:
+                logger.info("export: %d/%d reports", len(done), len(jobs))
+    _write_index(output, done)
+
+    return {
+        'reports': len(done),
+        'skipped': [f'{country} {years[0]}-{years[1]}' for country, years in skipped],
+        'bytes': written,
+        'workers': workers,
+        'seconds': round(time.perf_counter() - started, 2),
+        'output': str(output),
+    }
+
+
+def _year_range(value):
+    try:
+        first, last = (int(part) for part in value.split('-', 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected FIRST-LAST, got {value!r}")
+    if first > last:
+        raise argparse.ArgumentTypeError(f"empty year range {value!r}")
+    return first, last
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', type=Path, default=Path('reports'), help='directory of the reports')
+    parser.add_argument('--years', type=_year_range, action='append',
+                        help='year range FIRST-LAST, repeatable (default: all years)')
+    parser.add_argument('--country', action='append', help='country to report, repeatable (default: all)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--data', type=Path, help="CSV to report on (default: the dashboard's)")
+    args = parser.parse_args(argv)
+
+    cli.setup_logging()
+
+    summary = export(args.output, args.years, args.country, args.workers, args.data)
+    logger.info("export: %d reports (%.1f MB) in %ss, %d skipped without data",
+                summary['reports'], summary['bytes'] / 1e6, summary['seconds'], len(summary['skipped']))
+    return 0
+
+
+if __name__ == '__main__':
+    cli.run('dashboard.export_reports')
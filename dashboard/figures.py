@@ -0,0 +1,853 @@
+"""Plotly figures of the dashboard panels, built from per-process skeletons.
+
+Building a figure through Plotly Express validates every property and costs
+more than the aggregation behind it. Each panel is therefore built once per
+process through its builder below, on a small sample table, and the result
+is kept as a skeleton: the finished layout plus one trace template per
+trace group. Figures for a filter state are then produced by copying the
+templates and swapping in the data arrays, and the finished figure dicts are
+memoized per filter state like the aggregates they are drawn from.
+
+Inputs the skeletons do not cover (an unknown sex, an empty table) go
+through the builders directly, which are the reference the skeleton path
+must reproduce. The animated GDP scatter is assembled from per-year frames
+cut out of the memoized country-year table, each frame carrying only the
+data arrays of its traces.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from dashboard import aggregates, compaction, geo, settings
+from dashboard.aggregates import AGE_ORDER, INCOME_COLORS, INCOME_ORDER
+from dashboard.memo import memoize
+
+SEX_COLORS = {'Male': '#20b2aa', 'Female': '#ff6b6b'}
+
+# Stand-in trace name used to find the group label inside trace templates
+_PLACEHOLDER = '__group__'
+
+
+# --- Builders --------------------------------------------------------------
+
+def build_age_figure(age_data):
+    fig_age = px.bar(
+        age_data,
+        x='Age',
+        y='Rate per 100K',
+        color='Sex',
+        color_discrete_map=SEX_COLORS
+    )
+    fig_age.update_layout(
+        height=250,
+        margin=dict(l=40, r=20, t=30, b=50),
+        font=dict(size=12),
+        xaxis_tickangle=-45,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=11)),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    fig_age.update_xaxes(title_font_size=12, tickfont_size=11)
+    fig_age.update_yaxes(title_font_size=12, tickfont_size=11)
+    return fig_age
+
+
+def build_map_figure(country_data):
+    fig_map = px.choropleth(
+        country_data,
+        geojson=settings.GEOJSON_URL,
+        featureidkey='id',
+        locations=geo.resolve(country_data['Country']),
+        color='Rate per 100K',
+        hover_name='Country',
+        hover_data={'Suicides Count': True, 'Rate per 100K': ':.1f', 'Population': ':,'},
+        color_continuous_scale=['#e8f5e8', '#20b2aa', '#ffa500', '#ff6b6b', '#cc0000'],
+        range_color=[0, 50]
+    )
+    # Name and values only; the ISO code plotly would list is just the lookup key
+    fig_map.update_traces(hovertemplate=(
+        '<b>%{hovertext}</b><br><br>Suicides Count=%{customdata[0]}<br>'
+        'Rate per 100K=%{z:.1f}<br>Population=%{customdata[2]:,}<extra></extra>'
+    ))
+    # Every country outline in grey underneath, in place of the base map
+    outlines = geo.outline_codes()
+    fig_map.add_trace(go.Choropleth(
+        geojson=settings.GEOJSON_URL,
+        featureidkey='id',
+        locations=outlines,
+        z=np.zeros(len(outlines), dtype=np.int8),
+        name='outlines',
+        colorscale=[[0, '#eeeeee'], [1, '#eeeeee']],
+        showscale=False,
+        hoverinfo='skip',
+        marker_line_color='#cccccc',
+        marker_line_width=0.5
+    ))
+    fig_map.data = fig_map.data[::-1]
+    fig_map.update_layout(
+        height=250,
+        margin=dict(l=0, r=0, t=30, b=10),
+        font=dict(size=11),
+        geo=dict(
+            visible=False,
+            showframe=False,
+            projection_type='natural earth',
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig_map
+
+
+def build_gender_figure(gender_trends, gender_pivot):
+    if gender_pivot is not None:
+        # Create dual-axis chart showing both rates and ratio
+        fig_gender = go.Figure()
+
+        # Add male and female rates
+        fig_gender.add_trace(go.Scatter(
+            x=gender_pivot['Year'],
+            y=gender_pivot['Male'],
+            name='Male Rate',
+            line=dict(color='#20b2aa', width=3),
+            yaxis='y'
+        ))
+
+        fig_gender.add_trace(go.Scatter(
+            x=gender_pivot['Year'],
+            y=gender_pivot['Female'],
+            name='Female Rate',
+            line=dict(color='#ff6b6b', width=3),
+            yaxis='y'
+        ))
+
+        # Add ratio line on secondary axis
+        fig_gender.add_trace(go.Scatter(
+            x=gender_pivot['Year'],
+            y=gender_pivot['Male-to-Female Ratio'],
+            name='M/F Ratio',
+            line=dict(color='#ffa500', width=2, dash='dash'),
+            yaxis='y2'
+        ))
+
+        fig_gender.update_layout(
+            height=200,
+            margin=dict(l=40, r=40, t=30, b=40),
+            font=dict(size=11),
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=10)),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            yaxis=dict(
+                title="Rate per 100K",
+                side="left",
+                showgrid=True,
+                gridcolor='rgba(128,128,128,0.2)'
+            ),
+            yaxis2=dict(
+                title="M/F Ratio",
+                side="right",
+                overlaying="y",
+                showgrid=False,
+                range=_ratio_range(gender_pivot)
+            ),
+            xaxis=dict(
+                showgrid=True,
+                gridcolor='rgba(128,128,128,0.2)'
+            )
+        )
+    else:
+        # Fallback if data doesn't have both sexes
+        fig_gender = px.line(
+            gender_trends,
+            x='Year',
+            y='Rate per 100K',
+            color='Sex',
+            color_discrete_map=SEX_COLORS
+        )
+        fig_gender.update_layout(
+            height=200,
+            margin=dict(l=40, r=20, t=30, b=40),
+            font=dict(size=12),
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=11)),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+
+    fig_gender.update_xaxes(title_font_size=11, tickfont_size=10)
+    fig_gender.update_yaxes(title_font_size=11, tickfont_size=10)
+    return fig_gender
+
+
+def _ratio_range(gender_pivot):
+    ratio = gender_pivot['Male-to-Female Ratio']
+    return [0, max(ratio) * 1.1] if not ratio.empty else [0, 5]
+
+
+def _render_mode(data):
+    """Scatter traces switch to WebGL above the configured number of points"""
+    return 'webgl' if len(data) > settings.WEBGL_POINTS else 'svg'
+
+
+def build_trends_figure(trend_summary, chart_title):
+    fig_gdp = px.line(
+        trend_summary,
+        x='Year',
+        y='Rate per 100K',
+        color='Country',
+        markers=True,
+        render_mode=_render_mode(trend_summary),
+        hover_data=['GDP Per Capita ($)', 'Income Level']
+    )
+
+    fig_gdp.update_traces(
+        marker=dict(size=6),
+        line=dict(width=2)
+    )
+
+    fig_gdp.update_layout(
+        title=dict(text=chart_title, font=dict(size=12), y=0.98),
+        hovermode='x unified'
+    )
+    return _style_economic_figure(fig_gdp, "Time Trends", None)
+
+
+def build_gdp_figure(gdp_data, present_income_order, color_map, animate=False):
+    if animate and len(gdp_data['Year'].unique()) > 1:
+        fig_gdp = px.scatter(
+            gdp_data,
+            x='GDP Per Capita ($)',
+            y='Rate per 100K',
+            color='Income Level',
+            size='Size',
+            hover_data=['Country', 'Suicides Count'],
+            color_discrete_map=color_map,
+            category_orders={'Income Level': present_income_order},
+            size_max=15,
+            animation_frame='Year',
+            animation_group='Country',
+            range_x=[gdp_data['GDP Per Capita ($)'].min() * 0.9, gdp_data['GDP Per Capita ($)'].max() * 1.1],
+            range_y=[0, gdp_data['Rate per 100K'].max() * 1.1]
+        )
+        fig_gdp.layout.updatemenus[0].buttons[0].args[1]["frame"]["duration"] = 1000
+    else:
+        fig_gdp = px.scatter(
+            gdp_data,
+            x='GDP Per Capita ($)',
+            y='Rate per 100K',
+            color='Income Level',
+            size='Size',
+            hover_data=['Country', 'Year', 'Suicides Count'],
+            color_discrete_map=color_map,
+            category_orders={'Income Level': present_income_order},
+            size_max=15,
+            render_mode=_render_mode(gdp_data)
+        )
+    return _style_economic_figure(fig_gdp, "GDP Correlation", _gdp_axis_range(gdp_data))
+
+
+def build_overview_figure(country_overview, present_income_order, color_map):
+    fig_gdp = px.scatter(
+        country_overview,
+        x='GDP Per Capita ($)',
+        y='Rate per 100K',
+        color='Income Level',
+        size='Size',
+        hover_data=['Country', 'Suicides Count'],
+        color_discrete_map=color_map,
+        category_orders={'Income Level': present_income_order},
+        size_max=20,
+        render_mode=_render_mode(country_overview)
+    )
+    return _style_economic_figure(fig_gdp, "Country Overview", _gdp_axis_range(country_overview))
+
+
+def build_rising_figure(rising, chart_title):
+    # Error bars run from the fitted slope to the bounds of its confidence interval
+    rising = rising.assign(**{
+        'CI Plus': rising['Slope High'] - rising['Slope per Year'],
+        'CI Minus': rising['Slope per Year'] - rising['Slope Low'],
+    })
+    fig_gdp = px.bar(
+        rising,
+        x='Slope per Year',
+        y='Country',
+        orientation='h',
+        error_x='CI Plus',
+        error_x_minus='CI Minus',
+        color_discrete_sequence=['#ff6b6b'],
+        hover_data=['Annual Change %', 'Steepest Group', 'Years Observed']
+    )
+    fig_gdp.update_layout(
+        title=dict(text=chart_title, font=dict(size=12), y=0.98),
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return _style_economic_figure(fig_gdp, "Fastest Rising", None)
+
+
+def _gdp_axis_range(data):
+    """Pad the GDP axis by 10% of the data range on both sides"""
+    if not data.empty:
+        min_gdp = data['GDP Per Capita ($)'].min()
+        max_gdp = data['GDP Per Capita ($)'].max()
+        gdp_range = max_gdp - min_gdp
+        x_min = max(0, min_gdp - gdp_range * 0.1)
+        x_max = max_gdp + gdp_range * 0.1
+    else:
+        x_min = 0
+        x_max = 82000
+    return [x_min, x_max]
+
+
+def _style_economic_figure(fig_gdp, econ_view, x_range):
+    fig_gdp.update_layout(
+        height=170,
+        margin=dict(l=40, r=40, t=10, b=40),
+        font=dict(size=11),
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=10),
+            itemsizing='constant'
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(
+            tickformat='$,.0f' if econ_view in ("GDP Correlation", "Country Overview") else None,
+            showgrid=True,
+            gridcolor='rgba(128,128,128,0.2)',
+            range=x_range
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='rgba(128,128,128,0.2)'
+        )
+    )
+    fig_gdp.update_xaxes(
+        title_font_size=11,
+        tickfont_size=10
+    )
+    fig_gdp.update_yaxes(title_font_size=11, tickfont_size=10)
+    return fig_gdp
+
+
+def build_top_figure(top_countries):
+    fig_top = px.bar(
+        top_countries,
+        x='Rate per 100K',
+        y='Country',
+        orientation='h',
+        color='Rate per 100K',
+        color_continuous_scale=['#20b2aa', '#ffa500', '#ff6b6b', '#cc0000'],
+        hover_data=['Risk Level', 'Suicides Count']
+    )
+    fig_top.update_layout(
+        height=200,
+        margin=dict(l=80, r=20, t=30, b=40),
+        font=dict(size=12),
+        showlegend=False,
+        yaxis={'categoryorder': 'total ascending'},
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    fig_top.update_xaxes(title_font_size=12, tickfont_size=11)
+    fig_top.update_yaxes(title_font_size=12, tickfont_size=11)
+    return fig_top
+
+
+# --- Skeletons ---------------------------------------------------------------
+
+class Skeleton:
+    """Finished layout of a panel plus its trace templates, keyed by trace name.
+
+    Figures assembled from a skeleton share every untouched part of it, so
+    neither the skeleton nor the figures built from it may be modified.
+    """
+
+    def __init__(self, fig):
+        spec = fig.to_dict()
+        self.layout = spec['layout']
+        self.templates = {trace.get('name', ''): trace for trace in spec['data']}
+
+    def trace(self, name, **data):
+        """Copy the template of one trace and put the data arrays in it"""
+        trace = self.templates[name]
+        for path, values in data.items():
+            trace = _with_path(trace, path, values)
+        return trace
+
+    def figure(self, traces, **layout):
+        """Assemble a figure dict around the layout, overriding some entries"""
+        fig_layout = self.layout
+        for path, value in layout.items():
+            fig_layout = _with_path(fig_layout, path, value)
+        return {'data': traces, 'layout': fig_layout}
+
+
+def _with_path(target, path, value):
+    """Copy of a dict with a value set at a double-underscore path, e.g. marker__size.
+
+    Only the dicts along the path are copied; everything else is shared.
+    """
+    key, _, rest = path.partition('__')
+    result = dict(target)
+    result[key] = _with_path(target.get(key, {}), rest, value) if rest else value
+    return result
+
+
+def _webgl(trace):
+    """Switch a scatter trace template to WebGL the way Plotly Express does"""
+    trace = dict(trace, type='scattergl')
+    trace.pop('orientation', None)
+    return trace
+
+
+def _sample_income_table(with_year):
+    """A small GDP scatter table holding every income level"""
+    data = pd.DataFrame({
+        'Country': [f'{_PLACEHOLDER}{i}' for i in range(len(INCOME_ORDER))],
+        'Year': [2000] * len(INCOME_ORDER),
+        'Suicides Count': [1] * len(INCOME_ORDER),
+        'GDP Per Capita ($)': [1000.0, 5000.0, 10000.0, 30000.0],
+        'Rate per 100K': [1.0, 2.0, 3.0, 4.0],
+        'Income Level': pd.Categorical(INCOME_ORDER, categories=INCOME_ORDER, ordered=True),
+    })
+    data['Size'] = data['Rate per 100K'] ** 1.5
+    if not with_year:
+        data = data.drop(columns='Year')
+    return data
+
+
+def _build_skeletons():
+    sexes = list(SEX_COLORS)
+    age_sample = pd.DataFrame({
+        'Age': pd.Categorical(AGE_ORDER[:1] * len(sexes), categories=AGE_ORDER, ordered=True),
+        'Sex': sexes,
+        'Rate per 100K': [1.0] * len(sexes),
+    })
+    country_sample = pd.DataFrame({
+        'Country': [_PLACEHOLDER],
+        'Suicides Count': [1],
+        'Population': [100000],
+        'Rate per 100K': [1.0],
+    })
+    pivot_sample = pd.DataFrame({
+        'Year': [2000], 'Male': [2.0], 'Female': [1.0], 'Male-to-Female Ratio': [2.0],
+    })
+    trends_sample = pd.DataFrame({
+        'Year': [2000] * len(sexes), 'Sex': sexes, 'Rate per 100K': [1.0] * len(sexes),
+    })
+    # One country per colour slot of the Time Trends chart (at most ten lines)
+    slots = 10
+    country_trends_sample = pd.DataFrame({
+        'Country': [f'{_PLACEHOLDER}{i}' for i in range(slots)],
+        'Year': [2000] * slots,
+        'Rate per 100K': [1.0] * slots,
+        'GDP Per Capita ($)': [1000.0] * slots,
+        'Income Level': ['Low Income'] * slots,
+    })
+    top_sample = country_sample.assign(**{'Risk Level': ['MODERATE']})
+    rising_sample = pd.DataFrame({
+        'Country': [_PLACEHOLDER],
+        'Slope per Year': [1.0],
+        'Slope Low': [0.5],
+        'Slope High': [1.5],
+        'Annual Change %': [1.0],
+        'Steepest Group': ['Male 75+ years'],
+        'Years Observed': [10],
+    })
+
+    skeletons = {
+        'age': Skeleton(build_age_figure(age_sample)),
+        # The map looks its countries up, so its sample has to be a real one
+        'map': Skeleton(build_map_figure(country_sample.assign(Country=['France']))),
+        'gender': Skeleton(build_gender_figure(None, pivot_sample)),
+        'gender_single': Skeleton(build_gender_figure(trends_sample, None)),
+        'trends': Skeleton(build_trends_figure(country_trends_sample, '')),
+        'gdp': Skeleton(build_gdp_figure(
+            _sample_income_table(True), INCOME_ORDER, INCOME_COLORS
+        )),
+        'gdp_animated': Skeleton(build_gdp_figure(
+            pd.concat([_sample_income_table(True), _sample_income_table(True).assign(Year=2001)]),
+            INCOME_ORDER, INCOME_COLORS, animate=True
+        )),
+        'overview': Skeleton(build_overview_figure(
+            _sample_income_table(False), INCOME_ORDER, INCOME_COLORS
+        )),
+        'top': Skeleton(build_top_figure(top_sample)),
+        'rising': Skeleton(build_rising_figure(rising_sample, '')),
+    }
+    # Time Trends lines take their colour from their position, not their name
+    skeletons['trends'].slots = [
+        skeletons['trends'].templates[f'{_PLACEHOLDER}{i}'] for i in range(slots)
+    ]
+    return skeletons
+
+
+_skeletons = None
+_skeletons_lock = threading.Lock()
+
+
+def skeletons():
+    """Return the panel skeletons, building them on first use in the process"""
+    global _skeletons
+    if _skeletons is None:
+        with _skeletons_lock:
+            if _skeletons is None:
+                _skeletons = _build_skeletons()
+    return _skeletons
+
+
+# --- Fast figure assembly ----------------------------------------------------
+
+def _groups(data, column):
+    """Yield (label, rows) for every value of a column, in order of appearance"""
+    codes, labels = pd.factorize(data[column])
+    for code, label in enumerate(labels):
+        yield label, data[codes == code]
+
+
+def _object_columns(data, columns):
+    """Stack table columns into the object array Plotly Express uses for customdata"""
+    stacked = np.empty((len(data), len(columns)), dtype=object)
+    for i, column in enumerate(columns):
+        stacked[:, i] = data[column].to_numpy(dtype=object)
+    return stacked
+
+
+def _age_figure(age_data):
+    skeleton = skeletons()['age']
+    if age_data.empty or not set(age_data['Sex']) <= set(skeleton.templates):
+        return build_age_figure(age_data).to_dict()
+    traces = [
+        skeleton.trace(
+            sex,
+            x=rows['Age'].to_numpy(dtype=object),
+            y=rows['Rate per 100K'].to_numpy()
+        )
+        for sex, rows in _groups(age_data, 'Sex')
+    ]
+    return skeleton.figure(traces)
+
+
+def _map_figure(country_data):
+    if country_data.empty:
+        return build_map_figure(country_data).to_dict()
+    skeleton = skeletons()['map']
+    countries = country_data['Country'].to_numpy(dtype=object)
+    trace = skeleton.trace(
+        '',
+        locations=geo.resolve(countries),
+        hovertext=countries,
+        z=country_data['Rate per 100K'].to_numpy(),
+        customdata=np.column_stack([
+            country_data['Suicides Count'].to_numpy(dtype=float),
+            country_data['Rate per 100K'].to_numpy(dtype=float),
+            country_data['Population'].to_numpy(dtype=float),
+        ])
+    )
+    return skeleton.figure([skeleton.templates['outlines'], trace])
+
+
+def _gender_figure(gender_trends, gender_pivot):
+    if gender_pivot is not None:
+        skeleton = skeletons()['gender']
+        years = gender_pivot['Year'].to_numpy()
+        traces = [
+            skeleton.trace('Male Rate', x=years, y=gender_pivot['Male'].to_numpy()),
+            skeleton.trace('Female Rate', x=years, y=gender_pivot['Female'].to_numpy()),
+            skeleton.trace('M/F Ratio', x=years, y=gender_pivot['Male-to-Female Ratio'].to_numpy()),
+        ]
+        return skeleton.figure(traces, yaxis2__range=_ratio_range(gender_pivot))
+
+    skeleton = skeletons()['gender_single']
+    if gender_trends.empty or not set(gender_trends['Sex']) <= set(skeleton.templates):
+        return build_gender_figure(gender_trends, gender_pivot).to_dict()
+    traces = [
+        skeleton.trace(sex, x=rows['Year'].to_numpy(), y=rows['Rate per 100K'].to_numpy())
+        for sex, rows in _groups(gender_trends, 'Sex')
+    ]
+    return skeleton.figure(traces)
+
+
+def _trends_figure(trend_summary, chart_title):
+    skeleton = skeletons()['trends']
+    groups = list(_groups(trend_summary, 'Country'))
+    if not groups or len(groups) > len(skeleton.slots):
+        return build_trends_figure(trend_summary, chart_title).to_dict()
+
+    use_webgl = len(trend_summary) > settings.WEBGL_POINTS
+    traces = []
+    for slot, (country, rows) in zip(skeleton.slots, groups):
+        placeholder = slot['name']
+        trace = dict(slot)
+        trace['name'] = trace['legendgroup'] = country
+        trace['hovertemplate'] = trace['hovertemplate'].replace(placeholder, country)
+        trace['x'] = rows['Year'].to_numpy()
+        trace['y'] = rows['Rate per 100K'].to_numpy()
+        trace['customdata'] = _object_columns(rows, ['GDP Per Capita ($)', 'Income Level'])
+        traces.append(_webgl(trace) if use_webgl else trace)
+    return skeleton.figure(traces, title__text=chart_title)
+
+
+def _income_scatter_figure(skeleton, data, present_income_order, hover_columns, size_max):
+    sizeref = data['Size'].max() / size_max ** 2
+    use_webgl = len(data) > settings.WEBGL_POINTS
+    traces = []
+    for level in present_income_order:
+        rows = data[data['Income Level'] == level]
+        if rows.empty:
+            continue
+        trace = skeleton.trace(
+            level,
+            x=rows['GDP Per Capita ($)'].to_numpy(),
+            y=rows['Rate per 100K'].to_numpy(),
+            marker__size=rows['Size'].to_numpy(),
+            marker__sizeref=sizeref,
+            customdata=_object_columns(rows, hover_columns)
+        )
+        traces.append(_webgl(trace) if use_webgl else trace)
+    return skeleton.figure(traces, xaxis__range=_gdp_axis_range(data))
+
+
+def _gdp_figure(gdp_data, present_income_order, color_map):
+    if gdp_data.empty or color_map != {k: INCOME_COLORS[k] for k in present_income_order}:
+        return build_gdp_figure(gdp_data, present_income_order, color_map).to_dict()
+    return _income_scatter_figure(
+        skeletons()['gdp'], gdp_data, present_income_order,
+        ['Country', 'Year', 'Suicides Count'], size_max=15
+    )
+
+
+def _cap_animation(gdp_data):
+    """Limit the animated table to the configured number of frames and points.
+
+    Returns the table to animate and a note describing what was left out.
+    Frames are thinned evenly over the years, keeping the first and the last,
+    and each frame keeps the countries with the largest total population.
+    """
+    notes = []
+    years = np.sort(gdp_data['Year'].unique())
+    if len(years) > settings.ANIMATION_MAX_FRAMES:
+        keep = np.linspace(0, len(years) - 1, settings.ANIMATION_MAX_FRAMES).round().astype(int)
+        notes.append(f"{len(np.unique(keep))} of {len(years)} years")
+        gdp_data = gdp_data[gdp_data['Year'].isin(years[keep])]
+
+    population = gdp_data.groupby('Country')['Population'].sum()
+    if len(population) > settings.ANIMATION_MAX_POINTS:
+        largest = population.nlargest(settings.ANIMATION_MAX_POINTS).index
+        notes.append(f"largest {len(largest)} of {len(population)} countries")
+        gdp_data = gdp_data[gdp_data['Country'].isin(largest)]
+    return gdp_data, ', '.join(notes)
+
+
+def _animated_gdp_figure(gdp_data, present_income_order):
+    """GDP vs rate scatter with one animation frame per year.
+
+    The first frame's traces are full trace templates; every frame only
+    carries the per-year arrays (positions, sizes, ids and hover data), which
+    plotly.js merges into those traces while animating.
+    """
+    skeleton = skeletons()['gdp']
+    controls = skeletons()['gdp_animated'].layout
+    hover_columns = ['Country', 'Year', 'Suicides Count']
+    sizeref = gdp_data['Size'].max() / 15 ** 2
+
+    data, note = _cap_animation(gdp_data)
+    data = data.sort_values('Year', kind='stable')
+    years, starts = np.unique(data['Year'].to_numpy(), return_index=True)
+    bounds = list(starts[1:]) + [len(data)]
+
+    frames = []
+    for year, start, stop in zip(years, starts, bounds):
+        rows = data.iloc[start:stop]
+        traces = []
+        for level in present_income_order:
+            level_rows = rows[rows['Income Level'] == level]
+            traces.append({
+                'x': level_rows['GDP Per Capita ($)'].to_numpy(),
+                'y': level_rows['Rate per 100K'].to_numpy(),
+                'ids': level_rows['Country'].to_numpy(dtype=object),
+                'customdata': _object_columns(level_rows, hover_columns),
+                'marker': {'size': level_rows['Size'].to_numpy()},
+            })
+        frames.append({'name': str(year), 'data': traces})
+
+    traces = [
+        skeleton.trace(
+            level,
+            x=frame_trace['x'],
+            y=frame_trace['y'],
+            ids=frame_trace['ids'],
+            customdata=frame_trace['customdata'],
+            marker__size=frame_trace['marker']['size'],
+            marker__sizeref=sizeref
+        )
+        for level, frame_trace in zip(present_income_order, frames[0]['data'])
+    ]
+
+    slider = controls['sliders'][0]
+    step = slider['steps'][0]
+    steps = [
+        dict(step, args=[[frame['name']], step['args'][1]], label=frame['name'])
+        for frame in frames
+    ]
+    if note:
+        slider = _with_path(slider, 'currentvalue__prefix', f"Year ({note})=")
+    fig = skeleton.figure(
+        traces,
+        xaxis__range=_gdp_axis_range(gdp_data),
+        yaxis__range=[0, gdp_data['Rate per 100K'].max() * 1.1],
+        updatemenus=controls['updatemenus'],
+        sliders=[dict(slider, steps=steps, active=0)]
+    )
+    fig['frames'] = frames
+    return fig
+
+
+def _overview_figure(country_overview, present_income_order, color_map):
+    if country_overview.empty or color_map != {k: INCOME_COLORS[k] for k in present_income_order}:
+        return build_overview_figure(country_overview, present_income_order, color_map).to_dict()
+    return _income_scatter_figure(
+        skeletons()['overview'], country_overview, present_income_order,
+        ['Country', 'Suicides Count'], size_max=20
+    )
+
+
+def _rising_figure(rising, chart_title):
+    if rising.empty:
+        return build_rising_figure(rising, chart_title).to_dict()
+    skeleton = skeletons()['rising']
+    slopes = rising['Slope per Year'].to_numpy()
+    trace = skeleton.trace(
+        '',
+        x=slopes,
+        y=rising['Country'].to_numpy(dtype=object),
+        error_x__array=rising['Slope High'].to_numpy() - slopes,
+        error_x__arrayminus=slopes - rising['Slope Low'].to_numpy(),
+        customdata=_object_columns(rising, ['Annual Change %', 'Steepest Group', 'Years Observed'])
+    )
+    return skeleton.figure([trace], title__text=chart_title)
+
+
+def _top_figure(top_countries):
+    if top_countries.empty:
+        return build_top_figure(top_countries).to_dict()
+    skeleton = skeletons()['top']
+    rates = top_countries['Rate per 100K'].to_numpy()
+    trace = skeleton.trace(
+        '',
+        x=rates,
+        y=top_countries['Country'].to_numpy(dtype=object),
+        marker__color=rates,
+        customdata=_object_columns(top_countries, ['Risk Level', 'Suicides Count'])
+    )
+    return skeleton.figure([trace])
+
+
+# --- Per-state figures -------------------------------------------------------
+
+@memoize()
+def age_chart(backend, state):
+    """Suicide Rates by Age Group"""
+    return _compacted(_age_figure(aggregates.age_sex_rates(backend, state)))
+
+
+@memoize()
+def map_chart(backend, state):
+    """Geographic Distribution"""
+    return _compacted(_map_figure(aggregates.country_rates(backend, state)))
+
+
+@memoize()
+def gender_chart(backend, state):
+    """Gender Gap Analysis Over Time"""
+    return _compacted(_gender_figure(*aggregates.gender_trends(backend, state)))
+
+
+@memoize()
+def economic_chart(backend, state, econ_view, animate):
+    """Economic Factors, in the selected view"""
+    if econ_view == "Time Trends":
+        return _compacted(_trends_figure(*aggregates.time_trends(backend, state)))
+    if econ_view == "GDP Correlation":
+        gdp_data, present_income_order, color_map = aggregates.gdp_correlation(backend, state)
+        if animate and len(gdp_data['Year'].unique()) > 1:
+            return _compacted(_animated_gdp_figure(gdp_data, present_income_order))
+        return _compacted(_gdp_figure(gdp_data, present_income_order, color_map))
+    if econ_view == "Fastest Rising":
+        return _compacted(_rising_figure(*aggregates.fastest_rising(backend, state)))
+    return _compacted(_overview_figure(*aggregates.country_overview(backend, state)))
+
+
+@memoize()
+def top_chart(backend, state):
+    """Top Countries by Rate"""
+    return _compacted(_top_figure(aggregates.top_countries(backend, state)))
+
+
+def as_figure(spec):
+    """Wrap a cached figure dict for st.plotly_chart without re-validating it"""
+    return go.Figure(spec, _validate=False)
+
+
+# Serialized sizes of recently drawn specs, keyed by identity; the entry keeps
+# its spec alive so the id cannot be reused while it is cached
+_PAYLOAD_SIZES = OrderedDict()
+_PAYLOAD_SIZES_MAX = 64
+_payload_lock = threading.Lock()
+
+
+# Payload sizes of recent figures before compaction, keyed like _PAYLOAD_SIZES;
+# only kept when settings.INSTRUMENTED
+_RAW_PAYLOAD_SIZES = OrderedDict()
+
+
+def _compacted(spec):
+    """Compact a finished figure, remembering its original size when instrumented"""
+    compacted = compaction.compact(spec)
+    if settings.INSTRUMENTED:
+        size = _serialized_bytes(spec)
+        with _payload_lock:
+            _RAW_PAYLOAD_SIZES[id(compacted)] = (compacted, size)
+            while len(_RAW_PAYLOAD_SIZES) > _PAYLOAD_SIZES_MAX:
+                _RAW_PAYLOAD_SIZES.popitem(last=False)
+    return compacted
+
+
+def raw_payload_bytes(spec):
+    """Payload size of a figure before compaction, None when not recorded"""
+    with _payload_lock:
+        cached = _RAW_PAYLOAD_SIZES.get(id(spec))
+    return cached[1] if cached is not None and cached[0] is spec else None
+
+
+def _serialized_bytes(spec):
+    return len(pio.to_json(as_figure(spec).to_dict(), validate=False).encode())
+
+
+def payload_bytes(spec):
+    """Size in bytes of the JSON st.plotly_chart sends for a figure spec"""
+    key = id(spec)
+    with _payload_lock:
+        cached = _PAYLOAD_SIZES.get(key)
+        if cached is not None and cached[0] is spec:
+            _PAYLOAD_SIZES.move_to_end(key)
+            return cached[1]
+    size = _serialized_bytes(spec)
+    with _payload_lock:
+        _PAYLOAD_SIZES[key] = (spec, size)
+        while len(_PAYLOAD_SIZES) > _PAYLOAD_SIZES_MAX:
+            _PAYLOAD_SIZES.popitem(last=False)
+    return size
@@ -0,0 +1,137 @@
+"""Index-based resolution of sidebar filter states to cube cell positions.
+
+The cube cells are stored in year order, so a year range is a contiguous
+slice found through an offset table. Countries are resolved through sorted
+per-country position lists and Sex/Age through per-value bitmaps, and the
+result is the intersection of the three. Nothing is copied from the cube:
+a state that only narrows the years resolves to a plain slice, anything else
+to an array of cell positions that the cube rollups consume directly.
+
+``resolve()`` stops short of the cell positions: it keeps the year range as
+positions in the Year labels and the Country/Sex/Age codes, which is all the
+cube's year prefix sums need, and computes the positions on first use.
+"""
+from functools import cached_property
+
+import numpy as np
+
+
+def _positions_by_value(codes, n_values):
+    """Return, for every code value, the sorted positions holding it"""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.cumsum(np.bincount(codes, minlength=n_values))[:-1]
+    return np.split(order, bounds)
+
+
+def _bitmaps(codes, n_values):
+    """Return an (n_values, n_cells) boolean matrix, one row per value"""
+    return codes[np.newaxis, :] == np.arange(n_values)[:, np.newaxis]
+
+
+class Selection:
+    """A filter state resolved against a FilterIndex.
+
+    `year_span` is the (start, stop) range of positions in the Year labels and
+    `codes` maps 'Country', 'Sex' and 'Age' to the selected label codes, or
+    None when every value is kept. `positions` are the matching cube cells.
+    """
+
+    def __init__(self, index, countries, year_range, sexes, ages):
+        self._index = index
+        self._filters = (countries, year_range, sexes, ages)
+        self.year_span = index.year_span(year_range)
+        self.codes = {
+            'Country': None if countries is None else index._value_codes('Country', countries),
+            'Sex': index._series_codes('Sex', sexes),
+            'Age': index._series_codes('Age', ages),
+        }
+
+    @cached_property
+    def positions(self):
+        return self._index.select(*self._filters)
+
+
+class FilterIndex:
+    """Year offsets, country position lists and Sex/Age bitmaps for a cube"""
+
+    def __init__(self, cube):
+        self.cube = cube
+        year_codes = cube.codes['Year']
+        if len(year_codes) > 1 and np.any(np.diff(year_codes) < 0):
+            raise ValueError("cube cells must be stored in year order")
+        n_years = len(cube.labels['Year'])
+        # year_offsets[i] is the first cell of the i-th year, the last entry is len(cube)
+        self.year_offsets = np.searchsorted(year_codes, np.arange(n_years + 1))
+        self.country_positions = _positions_by_value(
+            cube.codes['Country'], len(cube.labels['Country'])
+        )
+        self.bitmaps = {
+            dim: _bitmaps(cube.codes[dim], len(cube.labels[dim]))
+            for dim in ('Sex', 'Age')
+        }
+
+    @property
+    def token(self):
+        """Cache token of the indexed cube"""
+        return self.cube.token
+
+    def _value_codes(self, dim, values):
+        """Map filter values to codes, ignoring values the data never has"""
+        labels = self.cube.labels[dim]
+        return np.flatnonzero(np.isin(labels, list(values)))
+
+    def _series_codes(self, dim, values):
+        """Codes of a Sex/Age filter, None when it keeps every value"""
+        if values is None:
+            return None
+        codes = self._value_codes(dim, values)
+        return None if len(codes) == len(self.cube.labels[dim]) else codes
+
+    def year_span(self, year_range):
+        """(start, stop) positions of a year range in the Year labels"""
+        if year_range is None:
+            return 0, len(self.cube.labels['Year'])
+        year_labels = self.cube.labels['Year']
+        first = int(np.searchsorted(year_labels, year_range[0], side='left'))
+        last = int(np.searchsorted(year_labels, year_range[1], side='right'))
+        return first, max(first, last)
+
+    def resolve(self, countries=None, year_range=None, sexes=None, ages=None):
+        """Return the Selection of a filter state, see select() for the filters"""
+        return Selection(self, countries, year_range, sexes, ages)
+
+    def select(self, countries=None, year_range=None, sexes=None, ages=None):
+        """Return the cube cells matching a filter state.
+
+        A filter left as None keeps every value of that dimension. The result
+        is a slice when only the years are restricted, otherwise a sorted
+        array of cell positions.
+        """
+        first, last = self.year_span(year_range)
+        start, stop = int(self.year_offsets[first]), int(self.year_offsets[last])
+
+        candidates = None
+        if countries is not None:
+            # Clip each country's sorted positions to the year window, then merge
+            parts = []
+            for code in self._value_codes('Country', countries):
+                positions = self.country_positions[code]
+                lo, hi = np.searchsorted(positions, [start, stop])
+                parts.append(positions[lo:hi])
+            candidates = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+        mask = None
+        for dim, values in (('Sex', sexes), ('Age', ages)):
+            codes = self._series_codes(dim, values)
+            if codes is None:
+                continue
+            rows = self.bitmaps[dim][codes]
+            rows = rows[:, candidates] if candidates is not None else rows[:, start:stop]
+            dim_mask = rows.any(axis=0)
+            mask = dim_mask if mask is None else mask & dim_mask
+
+        if candidates is not None:
+            return candidates if mask is None else candidates[mask]
+        if mask is None:
+            return slice(start, stop)
+        return np.flatnonzero(mask) + start
@@ -0,0 +1,97 @@
+"""Country codes and geometry of the Geographic Distribution map.
+
+The map draws the outlines in static/countries.geojson: Natural Earth's
+1:110m Admin 0 countries (public domain), simplified to about 0.1 degree and
+keyed by ISO 3166-1 alpha-3 code. Streamlit serves the file as a static asset
+(server.enableStaticServing), so every figure only references its URL and the
+browser fetches the geometry once, from the dashboard server itself.
+
+Dataset country names are resolved to ISO-3 codes once per process: by the
+feature names of the GeoJSON, then through ISO3_OVERRIDES for the names the
+dataset spells differently and for countries too small to have an outline at
+this scale (they get no shape on the map, as before).
+"""
+import json
+import logging
+import threading
+
+import numpy as np
+
+from dashboard import settings
+
+logger = logging.getLogger(__name__)
+
+GEOJSON_PATH = settings.BASE_DIR / 'static' / 'countries.geojson'
+
+# Dataset names that do not match a GeoJSON feature name
+ISO3_OVERRIDES = {
+    'Antigua and Barbuda': 'ATG',
+    'Aruba': 'ABW',
+    'Bahrain': 'BHR',
+    'Barbados': 'BRB',
+    'Bosnia and Herzegovina': 'BIH',
+    'Cabo Verde': 'CPV',
+    'Czech Republic': 'CZE',
+    'Dominica': 'DMA',
+    'Grenada': 'GRD',
+    'Kiribati': 'KIR',
+    'Macau': 'MAC',
+    'Maldives': 'MDV',
+    'Malta': 'MLT',
+    'Mauritius': 'MUS',
+    'Republic of Korea': 'KOR',
+    'Russian Federation': 'RUS',
+    'Saint Kitts and Nevis': 'KNA',
+    'Saint Lucia': 'LCA',
+    'Saint Vincent and Grenadines': 'VCT',
+    'San Marino': 'SMR',
+    'Seychelles': 'SYC',
+    'Singapore': 'SGP',
+    'United States': 'USA',
+}
+
+_loaded = None
+_tables_lock = threading.Lock()
+
+
+def _load_tables():
+    with open(GEOJSON_PATH) as f:
+        features = json.load(f)['features']
+    codes = {feature['properties']['name']: feature['id'] for feature in features}
+    codes.update(ISO3_OVERRIDES)
+    return codes, sorted(feature['id'] for feature in features)
+
+
+def _tables():
+    """(name -> ISO-3 code, outline codes), loaded on first use in the process"""
+    global _loaded
+    if _loaded is None:
+        with _tables_lock:
+            if _loaded is None:
+                _loaded = _load_tables()
+    return _loaded
+
+
+def outline_codes():
+    """ISO-3 codes of every country the GeoJSON has an outline for"""
+    return _tables()[1]
+
+
+def resolve(countries):
+    """ISO-3 codes of country names as an object array.
+
+    Unknown names are logged once and passed through, which draws nothing
+    for them.
+    """
+    codes = _tables()[0]
+    resolved = np.empty(len(countries), dtype=object)
+    for i, name in enumerate(countries):
+        code = codes.get(name)
+        if code is None:
+            with _tables_lock:
+                if name not in codes:
+                    logger.warning("no ISO-3 code for country %r; add it to geo.ISO3_OVERRIDES", name)
+                    codes[name] = name
+            code = codes[name]
+        resolved[i] = code
+    return resolved
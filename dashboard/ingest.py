@@ -0,0 +1,163 @@
+"""Incremental ingestion of delta CSVs into the live dataset.
+
+A delta is a CSV with the dashboard's columns holding new country-years or
+corrected rows. Its rows are upserted on (Country, Year, Sex, Age): a row
+replaces the existing row with the same key, or is added. Only the
+country-years a delta touches are re-aggregated (see Cube.upsert), and the
+result is published as a new (dataset, backend) pair with a new memo token,
+so sessions see the update on their next rerun without a restart.
+
+Deltas are applied in file name order and left in place, so a restarted
+process replays them on top of the base CSV. Re-applying a delta is
+harmless, since upserts are idempotent.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard import settings
+from dashboard.backends import create_backend
+from dashboard.data_store import (
+    FLOAT_COLUMNS, INTEGER_COLUMNS, KEY, TEXT_COLUMNS, clean, file_digest, load_dataset
+)
+
+logger = logging.getLogger(__name__)
+
+# One consistent version of the data: sessions read both members together
+Snapshot = namedtuple('Snapshot', ['df', 'backend', 'version'])
+
+
+def read_delta(path):
+    """Read and validate a delta CSV; raises ValueError when it is malformed"""
+    delta = clean(pd.read_csv(path), Path(path).name)
+    for column in INTEGER_COLUMNS:
+        delta[column] = delta[column].astype('int64')
+    for column in FLOAT_COLUMNS:
+        delta[column] = delta[column].astype('float64')
+    # Within one delta, the last row of a key wins
+    return delta.drop_duplicates(KEY, keep='last').reset_index(drop=True)
+
+
+def _matches(df, keys, columns):
+    """Boolean mask of the df rows whose `columns` values appear in `keys`"""
+    index = pd.MultiIndex.from_frame(df[columns].astype(object))
+    return index.isin(pd.MultiIndex.from_frame(keys[columns].astype(object)))
+
+
+def _concat(kept, added):
+    """Concatenate row sets, keeping text columns categorical"""
+    kept = kept.copy(deep=False)
+    added = added.copy()
+    for column in TEXT_COLUMNS:
+        if isinstance(kept[column].dtype, pd.CategoricalDtype):
+            categories = kept[column].cat.categories.union(pd.Index(added[column].unique()))
+            kept[column] = kept[column].cat.set_categories(categories)
+            added[column] = pd.Categorical(added[column], categories=categories)
+    return pd.concat([kept, added], ignore_index=True)
+
+
+def upsert_rows(df, delta):
+    """Return (dataset, rows): `df` with the delta upserted, and every row of
+    the country-years the delta touches. `df` is not modified."""
+    replaced = _matches(df, delta, KEY)
+    merged = _concat(df[~replaced], delta)
+    touched = _matches(df, delta, ['Country', 'Year']) & ~replaced
+    rows = _concat(df[touched], delta)
+    return merged, rows
+
+
+class LiveDataset:
+    """The process-wide dataset and query backend, updated by deltas"""
+
+    def __init__(self, df, backend):
+        self._lock = threading.Lock()
+        self._snapshot = Snapshot(df, backend, 0)
+        self._seen = {}
+        self._watcher = None
+
+    def snapshot(self):
+        """The current (df, backend, version), consistent with each other"""
+        return self._snapshot
+
+    def apply(self, delta, name='delta'):
+        """Upsert a validated delta frame and publish the new version"""
+        with self._lock:
+            current = self._snapshot
+            merged, rows = upsert_rows(current.df, delta)
+            source = current.df.attrs.get('digest', '')
+            delta_digest = hashlib.sha256(pd.util.hash_pandas_object(delta, index=False).to_numpy().tobytes())
+            merged.attrs['digest'] = hashlib.sha256(
+                (source + delta_digest.hexdigest()).encode()
+            ).hexdigest()
+            backend = current.backend.upsert(merged, rows)
+            snapshot = self._snapshot = Snapshot(merged, backend, current.version + 1)
+        logger.info(
+            "applied %s: %d rows upserted across %d country-years (version %d)",
+            name, len(delta), len(delta[['Country', 'Year']].drop_duplicates()), snapshot.version
+        )
+        return snapshot
+
+    def poll(self, directory):
+        """Apply every new or changed delta CSV of a directory, in name order"""
+        directory = Path(directory)
+        if not directory.is_dir():
+            return []
+        applied = []
+        for path in sorted(directory.glob('*.csv')):
+            try:
+                stamp = file_digest(path)
+            except OSError:
+                continue
+            if self._seen.get(path.name) == stamp:
+                continue
+            self._seen[path.name] = stamp
+            try:
+                self.apply(read_delta(path), name=path.name)
+            except (ValueError, OSError) as exc:
+                logger.error("rejected delta %s: %s", path.name, exc)
+                continue
+            applied.append(path.name)
+        return applied
+
+    def watch(self, directory, interval):
+        """Apply the deltas already present, then poll for new ones in a daemon thread"""
+        self.poll(directory)
+        if self._watcher is not None or interval <= 0:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.poll(directory)
+                except Exception:
+                    logger.exception("delta poll of %s failed", directory)
+
+        self._watcher = threading.Thread(target=run, name='delta-watcher', daemon=True)
+        self._watcher.start()
+
+
+_live = None
+_live_lock = threading.Lock()
+
+
+def live_dataset():
+    """The process-wide LiveDataset, loaded and watching for deltas on first use.
+
+    Uses the configured CSV, backend and delta directory. Raises
+    FileNotFoundError when the CSV is missing.
+    """
+    global _live
+    if _live is None:
+        with _live_lock:
+            if _live is None:
+                df = load_dataset(settings.DATA_PATH)
+                live = LiveDataset(df, create_backend(settings.BACKEND, df))
+                live.watch(settings.DELTA_DIR, settings.DELTA_POLL_SECONDS)
+                _live = live
+    return _live
@@ -0,0 +1,138 @@
+"""Bounded, thread-safe memoization shared by every session in the process."""
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from dashboard import profiling, settings
+
+
+def estimate_size(value):
+    """Rough size in bytes of a cached value, used for eviction"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True, index=True)
+        return int(size.sum()) if isinstance(value, pd.DataFrame) else int(size)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Least-recently-used mapping bounded by entry count and estimated bytes"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return the hit/miss counters and current occupancy"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_MISSING = object()
+
+# One memo per process, so every session shares the aggregates it computes
+AGGREGATE_CACHE = LRUCache(settings.MEMO_MAX_ENTRIES, settings.MEMO_MAX_BYTES)
+
+# Keys being computed right now, so concurrent callers wait instead of repeating the work
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def memoize(cache=AGGREGATE_CACHE):
+    """Cache a function of (source, *args) under (name, source.token, *args).
+
+    The source token changes whenever the underlying data does, so results
+    computed from an older dataset are never served. Cached values are shared
+    between sessions and must be treated as read-only by callers. A call that
+    finds its key being computed by another thread waits for that result.
+    During a profiled rerun (see dashboard.profiling) cached values are not
+    read: the work is redone, so it shows up in the profile, and its result
+    is stored as usual.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(source, *args):
+            key = (name, source.token) + args
+            if profiling.active():
+                value = func(source, *args)
+                cache.put(key, value)
+                return value
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            with _inflight_lock:
+                pending = _inflight.get(key)
+                owner = pending is None
+                if owner:
+                    pending = _inflight[key] = Future()
+            if not owner:
+                return pending.result()
+
+            try:
+                value = func(source, *args)
+                cache.put(key, value)
+                pending.set_result(value)
+                return value
+            except BaseException as exc:
+                pending.set_exception(exc)
+                raise
+            finally:
+                with _inflight_lock:
+                    del _inflight[key]
+        return wrapper
+    return decorator
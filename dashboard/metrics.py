@@ -0,0 +1,134 @@
+"""Export of rerun stage timings.
+
+Every finished rerun (see dashboard.timing) is passed to ``observe()``, a
+listener of the timing module registered on import, which appends it as one
+JSON line to METRICS_LOG and, at most every METRICS_INTERVAL seconds,
+rewrites METRICS_FILE in the Prometheus text format. Quantiles are taken over
+the process's recent reruns; the _sum and _count series are cumulative since
+start-up.
+"""
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+
+from dashboard import settings, timing
+
+logger = logging.getLogger(__name__)
+
+# Exported quantiles and their keys in summary()
+QUANTILES = {'0.5': 'p50', '0.95': 'p95'}
+
+_lock = threading.Lock()
+_totals = {}  # stage -> [count, seconds]
+_last_written = 0.0
+
+
+def _percentile(values, percent):
+    """Linearly interpolated percentile, like NumPy's default, without importing it"""
+    if len(values) == 1:
+        return float(values[0])
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def summary(runs=None):
+    """p50/p95 in seconds per stage (and 'total') over recent reruns"""
+    runs = list(timing.recent_runs) if runs is None else runs
+    samples = {}
+    for run in runs:
+        samples.setdefault('total', []).append(run['total'])
+        for stage, seconds in run['stages'].items():
+            samples.setdefault(stage, []).append(seconds)
+    return {
+        stage: {
+            'count': len(values),
+            'p50': _percentile(values, 50),
+            'p95': _percentile(values, 95),
+        }
+        for stage, values in samples.items()
+    }
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    """Current metrics in the Prometheus text exposition format"""
+    runs = list(timing.recent_runs)
+    lines = [
+        '# HELP dashboard_stage_seconds Duration of a named stage of a dashboard rerun.',
+        '# TYPE dashboard_stage_seconds summary',
+    ]
+    with _lock:
+        totals = {stage: tuple(values) for stage, values in _totals.items()}
+    for stage, stats in sorted(summary(runs).items()):
+        for quantile, key in QUANTILES.items():
+            lines.append(f'dashboard_stage_seconds{{stage="{_label(stage)}",quantile="{quantile}"}} {stats[key]:.6f}')
+        count, seconds = totals.get(stage, (stats['count'], 0.0))
+        lines.append(f'dashboard_stage_seconds_sum{{stage="{_label(stage)}"}} {seconds:.6f}')
+        lines.append(f'dashboard_stage_seconds_count{{stage="{_label(stage)}"}} {count}')
+
+    # Chart payloads of the latest rerun that drew each chart
+    gauges = {
+        'payload_bytes': 'Serialized size of the last figure sent for a chart.',
+        'raw_payload_bytes': 'Size the last figure sent for a chart had before compaction.',
+    }
+    for kind, description in gauges.items():
+        payloads = {}
+        for run in runs:
+            for name, value in run.get('values', {}).items():
+                chart, _, value_kind = name.partition('.')
+                if value_kind == kind:
+                    payloads[chart] = value
+        if payloads:
+            lines.append(f'# HELP dashboard_chart_{kind} {description}')
+            lines.append(f'# TYPE dashboard_chart_{kind} gauge')
+            for chart, value in sorted(payloads.items()):
+                lines.append(f'dashboard_chart_{kind}{{chart="{_label(chart)}"}} {int(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    """Atomically replace `path` with the current metrics"""
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_text(prometheus_text())
+    os.replace(tmp, path)
+
+
+def observe(run):
+    """Account one finished rerun and export it where configured"""
+    global _last_written
+    if run is None:
+        return
+    with _lock:
+        for stage, seconds in list(run['stages'].items()) + [('total', run['total'])]:
+            entry = _totals.setdefault(stage, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+        due = settings.METRICS_FILE is not None and time.time() - _last_written >= settings.METRICS_INTERVAL
+        if due:
+            _last_written = time.time()
+
+    line = json.dumps({
+        'event': 'rerun',
+        'at': run['finished_at'],
+        'tags': run['tags'],
+        'total_ms': round(run['total'] * 1000, 3),
+        'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in run['stages'].items()},
+        'values': run['values'],
+    }, default=str)
+    logger.debug(line)
+    try:
+        if settings.METRICS_LOG is not None:
+            with open(settings.METRICS_LOG, 'a') as f:
+                f.write(line + '\n')
+        if due:
+            write_prometheus(settings.METRICS_FILE)
+    except OSError as exc:
+        logger.warning("could not export rerun metrics: %s", exc)
+
+
+timing.add_listener(observe)
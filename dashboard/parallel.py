@@ -0,0 +1,42 @@
+"""Concurrent computation of the dashboard panels.
+
+The panels of a rerun depend only on the filter state, not on each other, so
+``prefetch()`` hands their memoized aggregate and figure functions to a
+process-wide thread pool before the page is drawn. The page then renders in
+layout order as before: each panel's call finds its result in the memo, or
+waits for the worker still computing it (see memo.memoize), so a rerun costs
+about the slowest panel rather than the sum of them. The NumPy rollups and the
+Polars and DuckDB backends release the GIL for most of their work.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard import profiling, settings
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    """The shared panel thread pool, or None when PANEL_WORKERS disables it"""
+    global _executor
+    if settings.PANEL_WORKERS <= 1:
+        return None
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(settings.PANEL_WORKERS, thread_name_prefix='panel')
+    return _executor
+
+
+def prefetch(calls):
+    """Start each (function, *args) call in the pool; returns their futures.
+
+    Results land in the memo, so callers just call the same functions again
+    when they need them. Without a pool, or in a profiled rerun (whose
+    profiler only sees the calling thread), nothing is started.
+    """
+    pool = executor()
+    if pool is None or profiling.active():
+        return []
+    return [pool.submit(function, *args) for function, *args in calls]
@@ -0,0 +1,114 @@
+"""Background prewarming of the process-wide caches.
+
+The first session after a deploy would otherwise pay for loading the
+dataset, building the backend, Plotly's first-use imports (the figure
+skeletons) and the first run of every aggregate. ``run()`` does all of that,
+in the start-up thread of dashboard.startup, then fills the aggregate and
+figure memo for the filter states listed in settings.PREWARM (none when it
+is 'off'). Progress and duration are logged and kept in ``status``.
+
+A state spec is one of:
+
+* ``default``: the view a new session opens on, in every Economic Factors view
+* ``since:<year>``: all countries from that year on, e.g. ``since:2010``
+* ``each-country``: every single country on its own
+* ``country:<name>``: one country
+
+Running ``python -m dashboard.prewarm [streamlit options]`` starts the
+start-up thread and then serves healthcare.py from the same process, so the
+caches fill while the server boots (and the JSON API, see dashboard/api.py,
+listens from the start). Otherwise the app starts it on its first run.
+"""
+import logging
+import sys
+import time
+
+from dashboard import aggregates, cli, figures, settings, startup
+from dashboard.aggregates import AGE_ORDER, make_filter_state
+from dashboard.ingest import live_dataset
+
+logger = logging.getLogger(__name__)
+
+ECONOMIC_VIEWS = ["Time Trends", "GDP Correlation", "Country Overview", "Fastest Rising"]
+
+status = {'state': 'idle', 'done': 0, 'total': 0, 'duration': None, 'error': None}
+
+
+def filter_states(specs, df):
+    """(state, economic views) pairs to warm for the given specs"""
+    years = int(df['Year'].min()), int(df['Year'].max())
+    sexes = df['Sex'].unique().tolist()
+    countries = sorted(df['Country'].unique().tolist())
+    default_views = ECONOMIC_VIEWS[:1]
+
+    planned = []
+    for spec in specs:
+        kind, _, value = spec.strip().partition(':')
+        if kind == 'default':
+            planned.append((make_filter_state(['All'], years, sexes, AGE_ORDER), ECONOMIC_VIEWS))
+        elif kind == 'since' and value.isdigit():
+            first = min(max(int(value), years[0]), years[1])
+            planned.append((make_filter_state(['All'], (first, years[1]), sexes, AGE_ORDER), default_views))
+        elif kind == 'each-country':
+            planned.extend(
+                (make_filter_state([country], years, sexes, AGE_ORDER), default_views) for country in countries
+            )
+        elif kind == 'country' and value in countries:
+            planned.append((make_filter_state([value], years, sexes, AGE_ORDER), default_views))
+        elif spec.strip():
+            logger.warning("ignoring unknown prewarm state %r", spec)
+    return planned
+
+
+def _warm(backend, state, views):
+    """Compute everything a session draws for one filter state"""
+    aggregates.kpis(backend, state)
+    figures.age_chart(backend, state)
+    figures.map_chart(backend, state)
+    figures.gender_chart(backend, state)
+    for view in views:
+        figures.economic_chart(backend, state, view, False)
+    figures.top_chart(backend, state)
+
+
+def run(specs=None):
+    """Prewarm synchronously, updating `status` as states complete"""
+    specs = settings.PREWARM if specs is None else specs
+    started = time.perf_counter()
+    status.update(state='running', done=0, total=0, duration=None, error=None)
+    try:
+        df, backend, _ = live_dataset().snapshot()
+        figures.skeletons()
+        planned = filter_states(specs, df)
+        status['total'] = len(planned)
+        logger.info("prewarm: dataset and figure skeletons ready after %.2fs, warming %d filter states",
+                    time.perf_counter() - started, len(planned))
+        for state, views in planned:
+            _warm(backend, state, views)
+            status['done'] += 1
+            if status['done'] % 25 == 0:
+                logger.info("prewarm: %d/%d filter states", status['done'], status['total'])
+        if planned:
+            # First serialization pays for Plotly's JSON encoder setup
+            figures.payload_bytes(figures.age_chart(backend, planned[0][0]))
+    except Exception as exc:
+        status.update(state='failed', error=str(exc), duration=time.perf_counter() - started)
+        logger.exception("prewarm failed")
+        return status
+    status.update(state='done', duration=time.perf_counter() - started)
+    logger.info("prewarm: done, %d filter states in %.2fs", status['done'], status['duration'])
+    return status
+
+
+def main(argv=None):
+    from streamlit.web import cli as streamlit_cli
+
+    argv = sys.argv[1:] if argv is None else argv
+    cli.setup_logging()
+    startup.start()
+    sys.argv = ['streamlit', 'run', str(settings.BASE_DIR / 'healthcare.py')] + list(argv)
+    return streamlit_cli.main()
+
+
+if __name__ == '__main__':
+    cli.run('dashboard.prewarm')
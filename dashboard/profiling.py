@@ -0,0 +1,181 @@
+"""Opt-in profiles of single dashboard reruns.
+
+Stage timings say which panel is slow, not why. With settings.PROFILE at its
+default 'query', opening the dashboard with ``?profile=1`` (for instance
+appended to a shared link of the slow view) runs that one rerun under a
+profiler; 'always' profiles every rerun and 'off' none. Nothing needs a
+redeploy: the switch is on the URL.
+
+The profiler is pyinstrument's sampling profiler when the package is
+installed, otherwise the standard library's deterministic cProfile. Each
+capture is saved under settings.PROFILE_DIR as three files sharing a stem of
+time, user and filter-state digest:
+
+* ``.pstats``: open with ``python -m pstats``, snakeviz, etc.
+* ``.html``: pyinstrument's interactive call tree, or a table of the
+  functions with the most cumulative time under cProfile
+* ``.json``: the user, the filter state, the duration, the profiler and how
+  the memo was used
+
+Only the newest settings.PROFILE_KEEP captures are kept. A profiled rerun
+computes its panels in the script thread (see parallel.prefetch), where the
+profiler sees them, and bypasses the process-wide memo (see dashboard.memo):
+every aggregate and figure is recomputed rather than read from the cache, so
+profiling the link of a view that was just slow shows the work that made it
+slow, not cache lookups. It therefore takes about as long as a cold rerun of
+that view; the recomputed values are stored in the memo as usual.
+"""
+import cProfile
+import hashlib
+import html
+import json
+import logging
+import pstats
+import threading
+import time
+from datetime import datetime
+
+from dashboard import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_PARAM = 'profile'
+
+# Rows of the cProfile HTML table
+HTML_ROWS = 80
+
+_local = threading.local()
+_rotate_lock = threading.Lock()
+
+
+def requested(query_values):
+    """Whether to profile this rerun, given the values of the ?profile= parameter"""
+    if settings.PROFILE == 'always':
+        return True
+    if settings.PROFILE == 'query':
+        return any(value.strip().lower() in ('1', 'true', 'yes', 'on') for value in query_values)
+    return False
+
+
+def active():
+    """Whether the calling thread is running a profiled rerun"""
+    return getattr(_local, 'capture', None) is not None
+
+
+def _state_tags(state):
+    if state is None:
+        return None
+    return {
+        'country': ['All'] if state.countries is None else list(state.countries),
+        'years': list(state.years),
+        'sex': list(state.sexes),
+        'age': list(state.ages),
+    }
+
+
+def _slug(value):
+    return ''.join(c if c.isalnum() or c in '-_' else '-' for c in str(value))[:32] or 'anonymous'
+
+
+def _stats_html(stats, title):
+    """Table of the functions with the most cumulative time in a cProfile"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:HTML_ROWS]
+    lines = [
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>',
+        '<style>body{font-family:sans-serif} table{border-collapse:collapse;font-size:0.85rem}'
+        'td,th{padding:2px 8px;border-bottom:1px solid #ddd;text-align:right}'
+        'td:last-child,th:last-child{text-align:left;font-family:monospace}</style></head><body>',
+        f'<h2>{html.escape(title)}</h2>',
+        f'<p>{stats.total_calls} calls in {stats.total_tt:.3f}s (cProfile); '
+        f'top {len(rows)} functions by cumulative time</p>',
+        '<table><tr><th>ncalls</th><th>tottime (s)</th><th>cumtime (s)</th><th>cumtime %</th>'
+        '<th>function</th></tr>',
+    ]
+    total = stats.total_tt or 1.0
+    for (filename, line, function), (primitive, calls, tottime, cumtime, _) in rows:
+        ncalls = f'{calls}/{primitive}' if calls != primitive else str(calls)
+        lines.append(
+            f'<tr><td>{ncalls}</td><td>{tottime:.4f}</td><td>{cumtime:.4f}</td>'
+            f'<td>{100 * cumtime / total:.1f}</td>'
+            f'<td>{html.escape(pstats.func_std_string((filename, line, function)))}</td></tr>'
+        )
+    lines.append('</table></body></html>')
+    return '\n'.join(lines)
+
+
+class Capture:
+    """Profile of the reruns run inside ``with Capture():``, see ``save()``"""
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            self.profiler_name = 'cProfile'
+            self._profiler = cProfile.Profile()
+        else:
+            self.profiler_name = 'pyinstrument'
+            self._profiler = Profiler(async_mode='disabled')
+        self.started_at = None
+        self.duration = None
+
+    def __enter__(self):
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        _local.capture = self
+        if self.profiler_name == 'pyinstrument':
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler_name == 'pyinstrument':
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.duration = time.perf_counter() - self._started
+        _local.capture = None
+        return False
+
+    def save(self, user, state, directory=None):
+        """Write the capture, tagged with the user and FilterState; returns the .html path"""
+        directory = settings.PROFILE_DIR if directory is None else directory
+        directory.mkdir(parents=True, exist_ok=True)
+        tags = _state_tags(state)
+        digest = hashlib.blake2b(json.dumps(tags).encode(), digest_size=4).hexdigest()
+        stem = f"{self.started_at:%Y%m%d-%H%M%S-%f}_{_slug(user)}_{digest}"
+        title = f"Rerun of {user or 'anonymous'} at {self.started_at:%Y-%m-%d %H:%M:%S}"
+
+        if self.profiler_name == 'pyinstrument':
+            from pyinstrument.renderers import PstatsRenderer
+
+            report = self._profiler.output_html()
+            # The renderer returns marshal bytes as a surrogate-escaped str
+            raw_stats = self._profiler.output(PstatsRenderer()).encode('utf-8', 'surrogateescape')
+            (directory / f'{stem}.pstats').write_bytes(raw_stats)
+        else:
+            self._profiler.dump_stats(directory / f'{stem}.pstats')
+            report = _stats_html(pstats.Stats(self._profiler), title)
+        html_path = directory / f'{stem}.html'
+        html_path.write_text(report, encoding='utf-8')
+        (directory / f'{stem}.json').write_text(json.dumps({
+            'user': user,
+            'filters': tags,
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(self.duration, 4),
+            'profiler': self.profiler_name,
+            'memo': 'bypassed',
+        }, indent=2))
+
+        _rotate(directory, settings.PROFILE_KEEP)
+        logger.info("profile of a %.2fs rerun saved as %s", self.duration, html_path)
+        return html_path
+
+
+def _rotate(directory, keep):
+    """Delete all but the newest `keep` captures in a directory"""
+    with _rotate_lock:
+        stems = sorted({path.stem for path in directory.glob('*.json')}, reverse=True)
+        for stem in stems[keep:]:
+            for suffix in ('.json', '.pstats', '.html'):
+                (directory / f'{stem}{suffix}').unlink(missing_ok=True)
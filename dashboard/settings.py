@@ -0,0 +1,96 @@
+"""Deployment settings, read once from DASHBOARD_* environment variables."""
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _int(name, default):
+    """Read an integer setting, falling back to the default when unset"""
+    value = os.environ.get(name, '').strip()
+    return int(value) if value else default
+
+
+def _flag(name):
+    """Read an on/off setting; unset means off"""
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _path(name):
+    """Read an optional file path setting"""
+    value = os.environ.get(name, '').strip()
+    return Path(value) if value else None
+
+
+# CSV the dashboard serves; benchmarks point this at scaled-up copies
+DATA_PATH = Path(os.environ.get('DASHBOARD_DATA_PATH') or BASE_DIR / 'Suicide_dashboard.csv')
+
+# Delta CSVs dropped here are upserted into the live dataset, keyed on
+# (Country, Year, Sex, Age); the directory is polled every few seconds
+DELTA_DIR = Path(os.environ.get('DASHBOARD_DELTA_DIR') or BASE_DIR / 'deltas')
+DELTA_POLL_SECONDS = _int('DASHBOARD_DELTA_POLL_SECONDS', 30)
+
+# Query backend of the panel aggregates: 'pandas' (in-memory cube), 'polars'
+# or 'duckdb'; the last two need their package installed
+BACKEND = os.environ.get('DASHBOARD_BACKEND', 'pandas').strip().lower()
+
+# Whether sidebar filter edits are batched behind an 'Apply filters' button
+# by default; every user can still switch the mode in the sidebar
+BATCH_FILTERS = _flag('DASHBOARD_BATCH_FILTERS')
+
+# Filter states warmed in a background thread at start-up, as comma-separated
+# specs (see dashboard/prewarm.py); 'off' warms none, though the dataset and
+# figure skeletons are still loaded in the background while users sign in
+_PREWARM = os.environ.get('DASHBOARD_PREWARM', 'default,since:2010,each-country').strip()
+PREWARM_ENABLED = _PREWARM.lower() not in ('', 'off', '0', 'false', 'no')
+PREWARM = [spec.strip() for spec in _PREWARM.split(',') if spec.strip()] if PREWARM_ENABLED else []
+
+# Threads computing the panels of a rerun concurrently; 1 computes them in
+# the script thread, one after another
+PANEL_WORKERS = _int('DASHBOARD_PANEL_WORKERS', min(6, os.cpu_count() or 1))
+
+# URL the map's country outlines (static/countries.geojson) are fetched from,
+# relative to the app page; change it when serving them from elsewhere
+GEOJSON_URL = os.environ.get('DASHBOARD_GEOJSON_URL', '').strip() or 'app/static/countries.geojson'
+
+# Scatter-heavy charts switch to WebGL (scattergl) traces above this many
+# points; 1000 is Plotly Express's own threshold
+WEBGL_POINTS = _int('DASHBOARD_WEBGL_POINTS', 1000)
+
+# Bounds of the process-wide aggregate memo shared by all sessions
+MEMO_MAX_ENTRIES = _int('DASHBOARD_MEMO_MAX_ENTRIES', 2048)
+MEMO_MAX_BYTES = _int('DASHBOARD_MEMO_MAX_MB', 256) * 1024 * 1024
+
+# Size limits of the 'Animate by Year' GDP scatter: at most this many frames
+# (years are thinned evenly) and this many countries per frame (the ones with
+# the largest population are kept)
+ANIMATION_MAX_FRAMES = _int('DASHBOARD_ANIMATION_MAX_FRAMES', 60)
+ANIMATION_MAX_POINTS = _int('DASHBOARD_ANIMATION_MAX_POINTS', 200)
+
+# Rerun instrumentation: the sidebar stage-timing panel is offered when
+# DEBUG_PANEL is on; finished reruns are appended as JSON lines to METRICS_LOG
+# and per-stage p50/p95 are written in Prometheus text format to METRICS_FILE
+# at most every METRICS_INTERVAL seconds
+DEBUG_PANEL = _flag('DASHBOARD_DEBUG_PANEL')
+METRICS_LOG = _path('DASHBOARD_METRICS_LOG')
+METRICS_FILE = _path('DASHBOARD_METRICS_FILE')
+METRICS_INTERVAL = _int('DASHBOARD_METRICS_INTERVAL', 15)
+
+# Whether anything reads the per-chart measurements (payload bytes before and
+# after compaction), which cost an extra serialization of every new figure
+INSTRUMENTED = bool(DEBUG_PANEL or METRICS_LOG or METRICS_FILE)
+
+# Local JSON API over the panel aggregates (dashboard/api.py): when the port
+# is set, the Streamlit process also serves it and shares its caches with it.
+# The API has no sign-in, so a host other than loopback is refused unless
+# API_PUBLIC is on
+API_HOST = os.environ.get('DASHBOARD_API_HOST', '').strip() or '127.0.0.1'
+API_PORT = _int('DASHBOARD_API_PORT', 0)
+API_PUBLIC = _flag('DASHBOARD_API_PUBLIC')
+
+# Profiles of single reruns (dashboard/profiling.py): 'query' profiles the
+# reruns opened with ?profile=1, 'always' every rerun and 'off' none. Captures
+# go to PROFILE_DIR, which keeps the newest PROFILE_KEEP of them
+PROFILE = os.environ.get('DASHBOARD_PROFILE', 'query').strip().lower()
+PROFILE_DIR = _path('DASHBOARD_PROFILE_DIR') or BASE_DIR / 'profiles'
+PROFILE_KEEP = _int('DASHBOARD_PROFILE_KEEP', 20)
@@ -0,0 +1,41 @@
+"""Background start-up of the dashboard process.
+
+The login form only needs Streamlit, so healthcare.py draws it before
+importing anything heavy, and ``start()`` does the rest of the start-up in a
+daemon thread while credentials are typed:
+
+* importing pandas, Plotly and the dashboard modules
+* starting the JSON API when DASHBOARD_API_PORT is set (dashboard/api.py)
+* loading the dataset and building the figure skeletons, then warming the
+  filter states of settings.PREWARM (dashboard/prewarm.py)
+
+A session that signs in meanwhile waits for whichever of these it needs,
+through the import lock and the live dataset's lock. Importing this module
+costs nothing beyond the standard library and settings.
+"""
+import logging
+import threading
+
+from dashboard import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_thread = None
+
+
+def _run():
+    from dashboard import api, prewarm
+
+    api.start()
+    prewarm.run(settings.PREWARM)
+
+
+def start():
+    """Start the background start-up, once per process"""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_run, name='startup', daemon=True)
+        _thread.start()
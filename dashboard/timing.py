@@ -0,0 +1,114 @@
+"""Stage timings of dashboard reruns.
+
+Wrap each named stage of a rerun in ``stage(name)`` between ``start_run()``
+and ``finish_run()``, note milestones with ``mark(name)``, and attach other
+measurements (such as chart payload bytes) with ``record(name, value)``.
+Timings are kept per thread, since every session runs its script in its own
+thread, and the most recent finished runs of the process are kept in
+``recent_runs`` for the metrics export and tooling such as the benchmarks.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+_local = threading.local()
+_lock = threading.Lock()
+
+# Most recent finished runs of the process, newest last
+recent_runs = deque(maxlen=256)
+
+# Callables given every finished run, e.g. the metrics export
+_listeners = []
+
+
+def add_listener(callback):
+    """Call `callback(run)` with every finished run"""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def start_run(**tags):
+    """Start timing a new rerun of the current thread"""
+    _local.run = {'tags': tags, 'stages': {}, 'values': {}, 'started': time.perf_counter()}
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as a named stage of the current rerun"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        run = getattr(_local, 'run', None)
+        if run is not None:
+            elapsed = time.perf_counter() - started
+            run['stages'][name] = run['stages'].get(name, 0.0) + elapsed
+
+
+def mark(name):
+    """Record the time since the start of the current rerun as a named stage.
+
+    For milestones such as the time to the login form or to the first chart,
+    which span several stages.
+    """
+    run = getattr(_local, 'run', None)
+    if run is not None:
+        run['stages'][name] = time.perf_counter() - run['started']
+
+
+def record(name, value):
+    """Attach a measured value to the current rerun"""
+    run = getattr(_local, 'run', None)
+    if run is not None:
+        run['values'][name] = value
+
+
+def current():
+    """Stages and values recorded so far in the current rerun, in seconds"""
+    run = getattr(_local, 'run', None)
+    if run is None:
+        return None
+    return {
+        'tags': run['tags'],
+        'total': time.perf_counter() - run['started'],
+        'stages': dict(run['stages']),
+        'values': dict(run['values']),
+    }
+
+
+def finish_run():
+    """Finish the current rerun and return its timings in seconds"""
+    run = getattr(_local, 'run', None)
+    if run is None:
+        return None
+    _local.run = None
+    result = {
+        'tags': run['tags'],
+        'total': time.perf_counter() - run['started'],
+        'stages': run['stages'],
+        'values': run['values'],
+        'finished_at': time.time(),
+    }
+    with _lock:
+        recent_runs.append(result)
+    for callback in _listeners:
+        callback(result)
+    return result
+
+
+@contextmanager
+def fragment_run(name):
+    """Time a fragment rerun of one panel as a run of its own.
+
+    During a full rerun the fragment is just part of that run, so nothing
+    extra is started.
+    """
+    if getattr(_local, 'run', None) is not None:
+        yield
+        return
+    start_run(fragment=name)
+    try:
+        yield
+    finally:
+        finish_run()
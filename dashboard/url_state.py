@@ -0,0 +1,65 @@
+"""Sidebar filter state in the URL query string.
+
+The applied filters are mirrored into the query string, so a shared link
+opens directly on that (memoized) state instead of the defaults followed by a
+series of edits. Filters left at their default are not written. Values are
+checked against the options the sidebar offers; unknown ones are dropped.
+
+    ?country=Japan&country=France&years=2000-2010&sex=Female&age=15-24+years
+"""
+PARAMS = ('country', 'years', 'sex', 'age')
+
+# An empty selection is written as a single empty value, absent means default
+_EMPTY = ['']
+
+
+def _values(state_member):
+    return list(state_member) if state_member else list(_EMPTY)
+
+
+def to_params(state, defaults):
+    """Query parameters of a FilterState, skipping members equal to `defaults`"""
+    params = {}
+    if state.countries != defaults.countries:
+        params['country'] = _values(state.countries)
+    if state.years != defaults.years:
+        params['years'] = [f'{state.years[0]}-{state.years[1]}']
+    if state.sexes != defaults.sexes:
+        params['sex'] = _values(state.sexes)
+    if state.ages != defaults.ages:
+        params['age'] = _values(state.ages)
+    return params
+
+
+def from_params(params, countries, years, sexes, ages):
+    """Sidebar widget values encoded in query parameters.
+
+    `params` maps parameter names to their list of values; the other
+    arguments are the options the sidebar offers (`years` as (min, max)).
+    Returns a dict with the 'countries', 'year_range', 'sex' and 'ages'
+    widget values that were present and valid.
+    """
+    values = {}
+
+    def pick(name, options):
+        chosen = [value for value in params[name] if value]
+        return [option for option in options if option in chosen]
+
+    if 'country' in params:
+        # Kept empty when the link says so; links naming only unknown countries open on 'All'
+        picked = pick('country', countries)
+        values['countries'] = picked if picked or params['country'] == _EMPTY else ['All']
+    if 'years' in params:
+        try:
+            first, last = (int(part) for part in params['years'][0].split('-', 1))
+        except (ValueError, IndexError):
+            pass
+        else:
+            first, last = max(first, years[0]), min(last, years[1])
+            if first <= last:
+                values['year_range'] = (first, last)
+    if 'sex' in params:
+        values['sex'] = pick('sex', sexes)
+    if 'age' in params:
+        values['ages'] = pick('age', ages)
+    return values